@@ -9,6 +9,17 @@ import time
 import argparse
 
 import signal
+import multiprocessing
+import mmap
+import gzip
+import bz2
+import lzma
+import array
+import collections
+import tempfile
+import threading
+
+from telemetry import Progress
 
 
 class TimeoutError(Exception):
@@ -20,6 +31,8 @@ def _timeout_handler(signum, frame):
 
 
 MKRange = (1,10)  # Range of k for (m,k) to be evaluated
+MinJobsPerSegment = 10000  # Minimal number of jobs of the partitioning task per segment for the parallel computation of anchor points
+AnchorChunkSize = 65536  # Number of anchor points that are buffered or read at once for out-of-core anchor points (AnchorStore)
 
 ##########
 # Tasks and Cause-Effect Chains
@@ -48,6 +61,198 @@ class Task:
         """Index of latest job with write-event no later than 'time'. If this value becomes negative, there is no such job."""
         return math.floor((time - self.phase - self.deadline) / self.period)
 
+class AnchorStore:
+    """Out-of-core anchor points: a sequence of (x, y) pairs stored as int64 in a memory-mapped file (in directory,
+    default: the temporary directory), for chains whose anchor points do not fit in memory.
+    Anchor points are appended in chunks of AnchorChunkSize during calc_anchors(); the store supports len(), indexing
+    (also negative indices), slicing (returns a list) and iteration like a list, and the metrics read it in chunks (see anchor_chunks()).
+    The file is removed by close() or when the store is garbage collected."""
+    def __init__(self, directory=None):
+        self.file = None  # set first, so that close() works if the file cannot be created
+        if directory is not None and not isinstance(directory, (str, os.PathLike)):
+            raise TypeError(f"The directory for out-of-core anchor points must be a path, not {directory!r}.")
+        if directory is not None and not os.path.isdir(directory):
+            raise ValueError(f"The directory for out-of-core anchor points does not exist: {directory}")
+        fd, self.path = tempfile.mkstemp(suffix=".anchors", dir=directory)
+        self.file = os.fdopen(fd, "w+b")
+        self.buffer = array.array('q')  # anchor points that are not written to the file yet (flattened)
+        self.flushed = 0  # number of anchor points in the file
+        self._mmap = None
+        self._view = None
+
+    def append(self, anchor):
+        self.buffer.extend(anchor)
+        if len(self.buffer) >= 2 * AnchorChunkSize:
+            self.flush()
+
+    def extend(self, anchors):
+        for anchor in anchors:
+            self.append(anchor)
+
+    def flush(self):
+        """Write the buffered anchor points to the file."""
+        if not self.buffer:
+            return
+        self._unmap()
+        self.file.seek(16 * self.flushed)
+        self.file.write(self.buffer.tobytes())
+        self.file.flush()
+        self.flushed += len(self.buffer) // 2
+        self.buffer = array.array('q')
+
+    def _unmap(self):
+        if self._view is not None:
+            self._view.release()
+            self._mmap.close()
+            self._view = self._mmap = None
+
+    def _flat(self):
+        # int64 view on the anchor points in the file (flattened)
+        if self._view is None:
+            self._mmap = mmap.mmap(self.file.fileno(), 16 * self.flushed, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._mmap).cast('q')
+        return self._view
+
+    def __len__(self):
+        return self.flushed + len(self.buffer) // 2
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            start, stop, step = idx.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            if stop <= start:
+                return []
+            self.flush()
+            values = self._flat()[2 * start:2 * stop].tolist()
+            return list(zip(values[0::2], values[1::2]))
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("anchor index out of range")
+        if idx < self.flushed:
+            flat = self._flat()
+            return (flat[2 * idx], flat[2 * idx + 1])
+        j = 2 * (idx - self.flushed)
+        return (self.buffer[j], self.buffer[j + 1])
+
+    def chunks(self, size=AnchorChunkSize):
+        """Lists of consecutive anchor points that overlap by one anchor point (each pair of consecutive anchor points is in one list)."""
+        self.flush()
+        flat = self._flat()
+        for start in range(0, max(len(self) - 1, 1), size):
+            values = flat[2 * start:2 * min(start + size + 1, len(self))].tolist()
+            yield list(zip(values[0::2], values[1::2]))
+
+    def __iter__(self):
+        for chunk in self.chunks():
+            yield from chunk[:-1]
+        yield self[-1]
+
+    def close(self):
+        """Remove the file."""
+        if self.file is None:
+            return
+        self._unmap()
+        self.file.close()
+        self.file = None
+        os.remove(self.path)
+
+    def __del__(self):
+        self.close()
+
+
+def anchor_chunks(anchors):
+    """The anchor points in lists that overlap by one anchor point: the list itself or the chunks of an AnchorStore."""
+    if isinstance(anchors, AnchorStore):
+        return anchors.chunks()
+    return (anchors,)
+
+
+class _AnchorReducer:
+    """Online construction of the anchor points from the (partstart, RT) entries of consecutive partitioned job chains.
+    Entries with the same start are merged (keeping the highest one) and redundant entries are dropped immediately,
+    so only the resulting anchor points are stored (in a list or in anchors, e.g., an AnchorStore)."""
+    def __init__(self, anchors=None):
+        self.first = None  # first entry (repeated after one hyperperiod)
+        self.last = None  # last completed entry
+        self.pending = None  # current entry, may still be merged with the next one
+        self.anchors = [] if anchors is None else anchors
+
+    @staticmethod
+    def redundantRT(entry1, entry2):
+        """Returns True if entry2 is redundant"""
+        return entry1[1] - entry2[1] == entry2[0] - entry1[0]
+
+    def add(self, x, y):
+        # If there is already such a point, keep the highest one
+        if self.pending is not None and self.pending[0] == x:
+            self.pending = (x, max(self.pending[1], y))
+            return
+        self._complete()
+        self.pending = (x, y)
+
+    def _complete(self):
+        if self.pending is None:
+            return
+        entry = self.pending
+        self.pending = None
+        if self.last is None:
+            self.first = entry  # not an anchor point by itself (only its repetition)
+        elif not self.redundantRT(self.last, entry):
+            self.anchors.append(entry)
+        self.last = entry
+
+    def extend(self, head, middle, last, pending):
+        """Add the entries of a segment, as returned by _segment_anchors()."""
+        for entry in head:
+            self.add(*entry)
+        if last is None:
+            return
+        self._complete()
+        self.anchors.extend(middle)
+        self.last = last
+        self.pending = pending
+
+    def finish(self, hyperperiod):
+        """Returns the anchor points. The first entry is repeated after one hyperperiod (it can potentially be non-redundant later on)."""
+        self._complete()
+        repeated = (self.first[0] + hyperperiod, self.first[1])
+        if not self.redundantRT(self.last, repeated):
+            self.anchors.append(repeated)
+        anchors = self.anchors
+        anchors.append((anchors[0][0] + hyperperiod, anchors[0][1]))
+
+        assert len(anchors)>1
+        assert self.redundantRT(anchors[-2], anchors[-1]) is False
+        return anchors
+
+
+def _segment_anchors(args):
+    """Entries of the partitioned job chains for the jobs lo, ..., hi-1 of the partitioning task p, for _AnchorReducer.extend().
+    Only the first two entries and the last entry can still change when the segments are combined (merging of
+    entries with the same start and redundancy w.r.t. the previous entry). Of the other entries, only the
+    non-redundant ones are returned (a redundant entry lies on the line of slope -1 through its predecessor, hence
+    removing it does not change the redundancy of its successor)."""
+    chain, p, lo, hi = args
+    entries = []  # entries with the same start merged
+    for jobidx in range(lo, hi):
+        partstart, partend = chain._partbounds(p, jobidx)
+        if entries and entries[-1][0] == partstart:
+            entries[-1] = (partstart, max(entries[-1][1], partend-partstart))
+            continue
+        # Entries before the last two are final
+        if len(entries) >= 4 and _AnchorReducer.redundantRT(entries[-3], entries[-2]):
+            del entries[-2]
+        entries.append((partstart, partend-partstart))
+    if len(entries) <= 4:
+        return entries, [], None, None
+    middle = entries[2:-1]
+    if _AnchorReducer.redundantRT(entries[-3], entries[-2]):
+        middle.pop()
+    return entries[:2], middle, entries[-2], entries[-1]
+
+
 class CEChain:
     """A Cause-Effect Chain."""
     def __init__(self, *tasks: Task, id: int = None):
@@ -58,6 +263,7 @@ class CEChain:
         self.warmup = None
         self.starttimes = None
         self.anchorsRT = None  # Minimal anchor points in $overline I'_{RT}$
+        self.anchors_path = None  # How the anchor points were computed (see calc_anchors)
 
     def calc_hyperperiod(self):
         """Calculate and store hyperperiod parameter."""
@@ -91,6 +297,42 @@ class CEChain:
         # Calculate a partitioned job chain.
         return (self._immbw(taskidx,jobidx), self._immfw(taskidx,jobidx+1))
 
+    def _partbounds(self, taskidx, jobidx):
+        # Start (read-event of first job) and end (write-event of last job) of a partitioned job chain.
+        part = self._part(taskidx, jobidx)
+        return (self.tasks[0].re(part[0][0]), self.tasks[-1].we(part[-1][-1]))
+
+    def compress(self):
+        """Equivalent chain with fewer tasks (same anchorsRT when using the same hyperperiod).
+        If the period of a task is an integer multiple of the period of its successor, every write-event of the task is
+        followed by a read-event of the successor after the same offset w. The two tasks are then merged into one task
+        with the read-events of the first task and the write-events of the second task (deadline D_i + w + D_(i+1))."""
+        tasks = [self.tasks[0]]
+        for nexttask in self.tasks[1:]:
+            thistask = tasks[-1]
+            if thistask.period % nexttask.period == 0:
+                w = (nexttask.phase - thistask.phase - thistask.deadline) % nexttask.period
+                tasks[-1] = Task(thistask.phase, thistask.period, thistask.deadline + w + nexttask.deadline)
+            else:
+                tasks.append(nexttask)
+        return CEChain(*tasks, id=self.id)
+
+    def structure(self) -> dict:
+        """Structural properties of the chain:
+        - harmonic: of any two periods, one is an integer multiple of the other
+        - synchronous: all tasks have the same phase
+        - implicit: all deadlines equal the periods
+        - single_partition: the hyperperiod equals the maximal period (e.g., for harmonic periods), i.e., there is only
+          one partitioned job chain per hyperperiod and the anchor points are given in closed form (see calc_anchors)."""
+        periods = sorted(tsk.period for tsk in self.tasks)
+        hyperperiod = self.hyperperiod if self.hyperperiod is not None else math.lcm(*periods)
+        return {
+            'harmonic': all(nxt % prev == 0 for prev, nxt in zip(periods, periods[1:])),
+            'synchronous': len({tsk.phase for tsk in self.tasks}) == 1,
+            'implicit': all(tsk.deadline == tsk.period for tsk in self.tasks),
+            'single_partition': hyperperiod == periods[-1],
+        }
+
     def calc_warmup(self):
         # Calculate warmup values and the start times where RT and DA become well-defined.
         firstfw = self._immfw(0,0)
@@ -99,8 +341,8 @@ class CEChain:
         self.warmup = firstbw
         self.starttimes = (self.tasks[0].re(self.warmup[0]), self.tasks[-1].we(self.warmup[-1]))
     
-    def calc_anchors(self, p=None):
-        """Calculate anchor points during the interval $overline I'$."""
+    def _partjobs(self, p=None):
+        # Partitioning task and the range of its job indices over the first hyperperiod.
         if p is None:
             # Find index with maximal period
             p = max(range(len(self.tasks)), key=lambda i: self.tasks[i].period)
@@ -110,46 +352,111 @@ class CEChain:
         if self.hyperperiod is None:
             self.calc_hyperperiod()
 
-        # List of anchor points
-        anchorsRT = list()
-        
-        # Find anchor points over first hyperperiod
         assert self.hyperperiod/self.tasks[p].period == self.hyperperiod//self.tasks[p].period
-        for jobidx in range(self.warmup[p],self.warmup[p]+self.hyperperiod//self.tasks[p].period):
-            # Calculate partitioned job chain
-            part = self._part(p, jobidx)
-            partstart = self.tasks[0].re(part[0][0])
-            partend = self.tasks[-1].we(part[-1][-1])
+        return p, range(self.warmup[p],self.warmup[p]+self.hyperperiod//self.tasks[p].period)
 
-            # If there is already such a point, keep the highest one
-            if len(anchorsRT) != 0 and anchorsRT[-1][0] == partstart:
-                anchorsRT[-1] = (partstart,max(anchorsRT[-1][1], partend-partstart))
-            else:
-                anchorsRT.append((partstart, partend-partstart))
-        
-        def repeatentry(entry):
-            return (entry[0] + self.hyperperiod, entry[1])
-
-        # == RT anchors ==
-        def redundantRT(entry1,entry2):
-            """Returns True if entry2 is redundant"""
-            return entry1[1] - entry2[1] == entry2[0] - entry1[0]
+    def iter_parts(self, p=None):
+        """Start and end of the partitioned job chains over the first hyperperiod (partitioned at task p)."""
+        p, jobs = self._partjobs(p)
+        for jobidx in jobs:
+            # Calculate partitioned job chain
+            yield self._partbounds(p, jobidx)
+
+    def calc_anchors(self, p=None, compress=False, workers=None, out_of_core=None):
+        """Calculate anchor points during the interval $overline I'$.
+        If the hyperperiod equals the maximal period (see structure()), the anchor points are computed in closed form in O(n).
+        If compress is set, the anchor points are computed on the compressed chain (see compress()).
+        If workers > 1, the jobs of the partitioning task are split into segments that are processed in parallel.
+        If out_of_core is set (a directory, '' for the temporary directory), the anchor points are stored in an AnchorStore instead of a list.
+        The path that was taken is stored in anchors_path ('closed-form', 'compressed', 'parallel' or 'enumeration')."""
+        if p is None and self.structure()['single_partition']:
+            self._calc_anchors_closed_form()
+            return
+
+        if compress and p is None:
+            reduced = self.compress()
+            if len(reduced.tasks) < len(self.tasks):
+                self._calc_anchors_compressed(reduced, workers, out_of_core)
+                self.anchors_path = 'compressed'
+                return
+
+        # Find anchor points over first hyperperiod (merged and reduced while the job chains are enumerated)
+        reducer = _AnchorReducer(None if out_of_core is None else AnchorStore(out_of_core or None))
+        p, jobs = self._partjobs(p)
+        if workers is not None and workers > 1 and len(jobs) >= MinJobsPerSegment * 2:
+            segments = min(workers, len(jobs) // MinJobsPerSegment)
+            bounds = [jobs.start + len(jobs) * k // segments for k in range(segments + 1)]
+            with multiprocessing.Pool(min(workers, segments)) as pool:
+                for segment in pool.imap(_segment_anchors, [(self, p, lo, hi) for lo, hi in zip(bounds, bounds[1:])]):
+                    reducer.extend(*segment)
+            self.anchors_path = 'parallel'
+        else:
+            for jobidx in jobs:
+                partstart, partend = self._partbounds(p, jobidx)
+                reducer.add(partstart, partend-partstart)
+            self.anchors_path = 'enumeration'
 
-        # Repeat first entry (First entry can potentially be non-redundant later on)
-        anchorsRT.append(repeatentry(anchorsRT[0]))
-        
-        # Find anchor points in I 
-        anchorsRTfromI = []
-        for idx in range(len(anchorsRT) - 1):
-            if not redundantRT(anchorsRT[idx], anchorsRT[idx+1]):
-                anchorsRTfromI.append(anchorsRT[idx+1])
-        anchorsRTfromI.append(repeatentry(anchorsRTfromI[0]))
+        # == Store anchors ==
+        self.anchorsRT = reducer.finish(self.hyperperiod)  # Careful: The anchor on the starttime might be artificial, i.e., not needed when describing later hyperperiods.
+        if out_of_core is not None:
+            self.anchorsRT.flush()
+
+    def _calc_anchors_closed_form(self):
+        # Hyperperiod H = maximal period: the single partitioned job chain per hyperperiod (at the task with maximal period)
+        # yields the only anchor point (x, y), the reaction time decreases with slope -1 until it repeats at x + H.
+        # Same anchor points as calc_anchors() (the first entry is only reported by its repetition).
+        p, jobs = self._partjobs()
+        partstart, partend = self._partbounds(p, jobs.start)
+        y = partend - partstart
+        self.anchorsRT = [(partstart + self.hyperperiod, y), (partstart + 2 * self.hyperperiod, y)]
+        self.anchors_path = 'closed-form'
+
+    def _calc_anchors_compressed(self, reduced, workers=None, out_of_core=None):
+        # Anchor points of the compressed chain, shifted to the interval in which calc_anchors() reports them for this chain.
+        if self.hyperperiod is None:
+            self.calc_hyperperiod()
+        reduced.hyperperiod = self.hyperperiod
+        reduced.calc_anchors(workers=workers, out_of_core=out_of_core)
+        self.anchorsRT = self._align_anchors(reduced.anchorsRT)
 
-        assert len(anchorsRTfromI)>1
-        assert redundantRT(anchorsRTfromI[-2], anchorsRTfromI[-1]) is False
+    def _align_anchors(self, anchors):
+        # Anchor points of an equivalent chain (e.g., the compressed chain), shifted to the interval in which calc_anchors() reports them for this chain.
+        # Both chains have the same anchor points modulo the hyperperiod, but the warmup of the equivalent chain can be shorter.
+        if self.hyperperiod is None:
+            self.calc_hyperperiod()
+        if self.warmup is None:
+            self.calc_warmup()
 
-        # == Store anchors ==
-        self.anchorsRT = anchorsRTfromI  # Careful: The anchor on the starttime might be artificial, i.e., not needed when describing later hyperperiods.
+        # calc_anchors() reports the anchor points in (x_s, x_s + H], where x_s is the start of the first partitioned job chain
+        p = max(range(len(self.tasks)), key=lambda i: self.tasks[i].period)
+        startx = self._partbounds(p, self.warmup[p])[0]
+        if isinstance(anchors, AnchorStore):
+            return self._align_anchor_store(anchors, startx)
+        aligned = sorted((startx + 1 + (x - startx - 1) % self.hyperperiod, y) for x, y in anchors[:-1])
+        aligned.append((aligned[0][0] + self.hyperperiod, aligned[0][1]))
+        return aligned
+
+    def _align_anchor_store(self, anchors, startx):
+        # Same as _align_anchors() for an AnchorStore, without sorting in memory: the anchor points (except the
+        # repeated last one) lie in one hyperperiod, so the shifted anchor points are a rotation of them.
+        hyperperiod = self.hyperperiod
+        n = len(anchors) - 1
+        cut = startx + 1 - hyperperiod * ((startx + 1 - anchors[0][0]) // hyperperiod)  # first time >= anchors[0][0] that is shifted to the start
+        lo, hi = 0, n
+        while lo < hi:  # first anchor point at or after cut
+            mid = (lo + hi) // 2
+            if anchors[mid][0] < cut:
+                lo = mid + 1
+            else:
+                hi = mid
+        aligned = AnchorStore(os.path.dirname(anchors.path))
+        for idx in itertools.chain(range(lo, n), range(lo)):
+            x, y = anchors[idx]
+            aligned.append((startx + 1 + (x - startx - 1) % hyperperiod, y))
+        aligned.append((aligned[0][0] + hyperperiod, aligned[0][1]))
+        aligned.flush()
+        anchors.close()
+        return aligned
 
 
 ##########
@@ -164,6 +471,38 @@ def ensure_filepath_exists(filepath: str):
         os.makedirs(directory)
 
 
+# Compressed files by extension: extension -> (module, default compression level)
+COMPRESSION = {
+    ".gz": (gzip, 6),
+    ".bz2": (bz2, 9),
+    ".xz": (lzma, 6),
+}
+
+
+def is_compressed(filepath: str):
+    return os.path.splitext(filepath)[1] in COMPRESSION
+
+
+def open_file(filepath: str, mode="r", level=None):
+    """Open a (text) file for reading, writing or appending. Files ending with .gz, .bz2 or .xz are (de)compressed
+    transparently; level is the compression level (gz, bz2: 1-9, xz: preset 0-9, default: see COMPRESSION).
+    Appending to a compressed file adds a new stream, which is read as part of the same file.
+
+    Example usage:
+    - with open_file("/path/to/chains.jsonl.gz", "w", level=1) as f: ...
+    """
+    ext = os.path.splitext(filepath)[1]
+    if ext not in COMPRESSION:
+        return open(filepath, mode)
+    module, default_level = COMPRESSION[ext]
+    level = default_level if level is None else level
+    if "r" in mode:
+        return module.open(filepath, mode + "t")
+    if module is lzma:
+        return lzma.open(filepath, mode + "t", preset=level)
+    return module.open(filepath, mode + "t", compresslevel=level)
+
+
 def save_chain_as_json(chain: CEChain, filepath: str):
     """Save CEChain object as JSON. Just stores the chain without the computed features.
     
@@ -180,19 +519,19 @@ def save_chain_as_json(chain: CEChain, filepath: str):
         ]
     }
 
-    with open(filepath, "w") as f:
+    with open_file(filepath, "w") as f:
         json.dump(chain_data, f, indent=4)
 
 
-def save_chains_as_jsonl(chains: list[CEChain], filepath: str):
-    """Save a list of CEChain objects as JSONL, one chain per line.
+def save_chains_as_jsonl(chains: list[CEChain], filepath: str, level=None):
+    """Save a list of CEChain objects as JSONL, one chain per line (compressed for .gz/.bz2/.xz, see open_file).
     
     Example usage:
     - save_chain_as_jsonl(chain, "/path/to/output.jsonl")
     """
     ensure_filepath_exists(filepath)
 
-    with open(filepath, "w") as f:
+    with open_file(filepath, "w", level=level) as f:
         for chain in chains:
             chain_data = {
                 "ID": chain.id,
@@ -206,34 +545,520 @@ def save_chains_as_jsonl(chains: list[CEChain], filepath: str):
 
 def load_chain_from_json(filepath: str) -> CEChain:
     """Load a CEChain object from a JSON file."""
-    with open(filepath, "r") as f:
+    with open_file(filepath, "r") as f:
         chain_data = json.load(f)
     
     tasks = [Task(t["phase"], t["period"], t["deadline"]) for t in chain_data["tasks"]]
     return CEChain(*tasks, id=chain_data["ID"])
 
 
-def load_chains_from_jsonl(filepath: str) -> list[CEChain]:
-    """Load a list of CEChain objects from a JSONL file."""
+def load_chains_from_jsonl(filepath: str, ids=None, id_range=None) -> list[CEChain]:
+    """Load a list of CEChain objects from a JSONL file.
+    With ids (list of chain IDs) or id_range (first ID, last ID), only the selected chains are read, using the
+    ID index of the file (see read_records_by_id): ids in the given order, id_range all chains from the first to the last ID
+    in file order. IDs may also be given as strings (e.g., from the command line). Raises KeyError for unknown IDs.
+
+    Example usage:
+    - load_chains_from_jsonl("/path/to/chains.jsonl", ids=["WATERS2019, SFM->Planner->DASM"])
+    - load_chains_from_jsonl("/path/to/chains.jsonl", id_range=(100, 199))
+    """
+    if ids is not None or id_range is not None:
+        return [_chain_from_record(record) for record in read_records_by_id(filepath, ids, id_range)]
+    chains = []
+    with open_file(filepath, "r") as f:
+        for line in f:
+            chains.append(_chain_from_record(json.loads(line.strip())))
+    return chains
+
+
+def _chain_from_record(chain_data: dict) -> CEChain:
+    tasks = [Task(t["phase"], t["period"], t["deadline"]) for t in chain_data["tasks"]]
+    return CEChain(*tasks, id=chain_data["ID"])
+
+
+def _record_id(line: bytes):
+    # ID of a JSONL record; the records written by this repository start with the ID, so usually only the ID is decoded
+    text = line.decode()
+    prefix = '{"ID": '
+    if text.startswith(prefix):
+        try:
+            return json.JSONDecoder().raw_decode(text, len(prefix))[0]
+        except json.JSONDecodeError:
+            pass
+    return json.loads(text)["ID"]
+
+
+def _index_key(id) -> bytes:
+    # Key of an ID in the index: its string representation as JSON string (no tabs or newlines)
+    return json.dumps(str(id)).encode()
+
+
+def build_id_index(filepath: str, idxpath: str):
+    """Write the ID index of a JSONL file (one streaming pass): a header line with the size and modification time of
+    the file, then one line '<ID as JSON string>\t<byte offset>' per record, sorted by ID (for duplicate IDs, the first
+    record comes first)."""
+    stat = os.stat(filepath)
+    entries = []
+    with open(filepath, "rb") as f:
+        offset = 0
+        for line in f:
+            if line.strip():
+                entries.append((_index_key(_record_id(line)), offset))
+            offset += len(line)
+    entries.sort()
+    with open(idxpath + ".tmp", "wb") as f:
+        f.write(json.dumps({"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}).encode() + b"\n")
+        for key, offset in entries:
+            f.write(key + b"\t%d\n" % offset)
+    os.replace(idxpath + ".tmp", idxpath)
+
+
+def _index_is_current(filepath: str, idxpath: str):
+    try:
+        with open(idxpath, "rb") as f:
+            header = json.loads(f.readline())
+        stat = os.stat(filepath)
+        return header["size"] == stat.st_size and header["mtime_ns"] == stat.st_mtime_ns
+    except (OSError, ValueError, KeyError):
+        return False
+
+
+def _index_lookup(index: bytes, start: int, key: bytes):
+    # Binary search over the sorted lines of the index (starting at byte start) for the first line with the key
+    lo, hi = start, len(index)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        linestart = index.rfind(b"\n", lo, mid) + 1 or lo
+        lineend = index.find(b"\n", linestart) + 1
+        if index[linestart:index.find(b"\t", linestart)] < key:
+            lo = lineend
+        else:
+            hi = linestart
+    if lo < len(index):
+        tab = index.find(b"\t", lo)
+        if index[lo:tab] == key:
+            return int(index[tab + 1:index.find(b"\n", tab)])
+    return None
+
+
+def read_records_by_id(filepath: str, ids=None, id_range=None) -> list[dict]:
+    """Records of a JSONL file with the given IDs (or from the first to the last ID of id_range in file order; KeyError
+    if an ID is not found or the last ID comes before the first one), read
+    directly at their byte offsets. The offsets are looked up by binary search in the ID index <filepath>.idx, which is
+    (re)built if it is missing or the size or modification time of the file changed.
+    IDs are compared by their string representation, i.e., 5 and "5" are the same ID.
+    Compressed files cannot be read at byte offsets; they are scanned instead (see _scan_records_by_id)."""
+    if is_compressed(filepath):
+        return _scan_records_by_id(filepath, ids, id_range)
+
+    idxpath = filepath + ".idx"
+    if not _index_is_current(filepath, idxpath):
+        build_id_index(filepath, idxpath)
+
+    with open(idxpath, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as index:
+            start = index.find(b"\n") + 1
+
+            def lookup(id):
+                offset = _index_lookup(index, start, _index_key(id))
+                if offset is None:
+                    raise KeyError(f"Chain ID {id!r} not found in {filepath}.")
+                return offset
+
+            if id_range is not None:
+                first, last = lookup(id_range[0]), lookup(id_range[1])
+                if first > last:
+                    raise KeyError(_reversed_range_message(id_range, filepath))
+            else:
+                offsets = [lookup(id) for id in ids]
+
+    records = []
+    with open(filepath, "rb") as f:
+        if id_range is not None:
+            f.seek(first)
+            while f.tell() <= last:
+                line = f.readline()
+                if not line:
+                    break
+                if line.strip():
+                    records.append(json.loads(line))
+        else:
+            for offset in offsets:
+                f.seek(offset)
+                records.append(json.loads(f.readline()))
+    return records
+
+
+def _reversed_range_message(id_range, filepath):
+    return f"Chain ID range {id_range[0]!r} to {id_range[1]!r} is reversed: {id_range[1]!r} comes before {id_range[0]!r} in {filepath}."
+
+
+def _scan_records_by_id(filepath: str, ids=None, id_range=None) -> list[dict]:
+    # Selection of read_records_by_id in one pass over the file (without index)
+    with open_file(filepath, "r") as f:
+        records = (json.loads(line) for line in f if line.strip())
+        if id_range is not None:
+            first, last = str(id_range[0]), str(id_range[1])
+            selected = []
+            last_seen = False
+            for record in records:
+                if selected or str(record["ID"]) == first:
+                    selected.append(record)
+                    if str(record["ID"]) == last:
+                        return selected
+                elif str(record["ID"]) == last:
+                    last_seen = True
+            if selected and last_seen:
+                raise KeyError(_reversed_range_message(id_range, filepath))
+            raise KeyError(f"Chain ID {id_range[1] if selected else id_range[0]!r} not found in {filepath}.")
+
+        keys = {str(id) for id in ids}
+        found = dict()
+        for record in records:
+            if str(record["ID"]) in keys:
+                found.setdefault(str(record["ID"]), record)
+    for id in ids:
+        if str(id) not in found:
+            raise KeyError(f"Chain ID {id!r} not found in {filepath}.")
+    return [found[str(id)] for id in ids]
+
+
+def shape_record(chain: CEChain) -> dict:
+    """Chain with its shape (hyperperiod, warmup, starttimes, anchor points) as a JSON-serializable dictionary.
+    The anchor points are stored flattened: [x_0, y_0, x_1, y_1, ...]."""
+    return {
+        "ID": chain.id,
+        "tasks": [{"phase": t.phase, "period": t.period, "deadline": t.deadline} for t in chain.tasks],
+        "hyperperiod": chain.hyperperiod,
+        "warmup": chain.warmup,
+        "starttimes": None if chain.starttimes is None else list(chain.starttimes),
+        "anchorsRT": [v for anchor in chain.anchorsRT for v in anchor],
+    }
+
+
+def chain_from_shape_record(shape_data: dict) -> CEChain:
+    """CEChain with the stored shape, i.e., the metrics can be computed without calculating the anchor points."""
+    chain = CEChain(*[Task(t["phase"], t["period"], t["deadline"]) for t in shape_data["tasks"]], id=shape_data["ID"])
+    chain.hyperperiod = shape_data["hyperperiod"]
+    chain.warmup = shape_data["warmup"]
+    chain.starttimes = None if shape_data["starttimes"] is None else tuple(shape_data["starttimes"])
+    flat = shape_data["anchorsRT"]
+    chain.anchorsRT = list(zip(flat[0::2], flat[1::2]))
+    return chain
+
+
+def save_shapes_as_jsonl(chains: list[CEChain], filepath: str, level=None):
+    """Save the shapes of analyzed CEChain objects as JSONL, one chain per line."""
+    ensure_filepath_exists(filepath)
+    with open_file(filepath, "w", level=level) as f:
+        for chain in chains:
+            f.write(json.dumps(shape_record(chain)) + "\n")
+
+
+def load_shapes_from_jsonl(filepath: str) -> list[CEChain]:
+    """Load a list of CEChain objects with their shapes from a JSONL file (see save_shapes_as_jsonl)."""
     chains = []
-    with open(filepath, "r") as f:
+    with open_file(filepath, "r") as f:
         for line in f:
-            chain_data = json.loads(line.strip())
-            tasks = [Task(t["phase"], t["period"], t["deadline"]) for t in chain_data["tasks"]]
-            chains.append(CEChain(*tasks, id=chain_data["ID"]))
+            chains.append(chain_from_shape_record(json.loads(line.strip())))
     return chains
 
 
+class ResultWriter:
+    """Appends results to a JSONL file. The file is flushed and fsynced periodically (every sync_every results or
+    sync_interval seconds; a background thread syncs results that have been pending for sync_interval seconds, e.g.,
+    during the analysis of a long-running chain), and a small progress journal is kept in <filepath>.progress.
+    With resume, the results already stored in the file are kept (an incomplete last line, e.g., from a crash, is
+    removed) and their IDs are available in done.
+    Compressed files (.gz, .bz2, .xz, see open_file) are supported; for .gz, each sync also flushes the compressor, for
+    .bz2 and .xz the results since the last complete stream may be lost in a crash.
+
+    Example usage:
+    - with ResultWriter("/path/to/results.jsonl", resume=True) as writer:
+          for chain in [ch for ch in chains if ch.id not in writer.done]:
+              writer.write(analyze(chain))
+    """
+    def __init__(self, filepath: str, resume=False, total=None, sync_every=100, sync_interval=10.0, level=None):
+        ensure_filepath_exists(filepath)
+        self.filepath = filepath
+        self.journalpath = filepath + ".progress"
+        self.total = total
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.level = level
+
+        self.done = set()
+        if resume and os.path.exists(filepath):
+            self._recover()
+        self.count = len(self.done)
+        self.last_id = None
+        self.file = open_file(filepath, "a" if resume else "w", level=level)
+        self.unsynced = 0
+        self.last_sync = time.time()
+
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        if sync_interval:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _recover(self):
+        # Read the IDs of the stored results and remove an incomplete last line
+        if is_compressed(self.filepath):
+            return self._recover_compressed()
+        valid_end = 0
+        with open(self.filepath, "rb") as f:
+            for line in f:
+                try:
+                    res = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                self.done.add(res["ID"])
+                valid_end += len(line)
+        if valid_end < os.path.getsize(self.filepath):
+            with open(self.filepath, "r+b") as f:
+                f.truncate(valid_end)
+
+    def _recover_compressed(self):
+        # Compressed files cannot be truncated: keep the complete lines of the readable part and rewrite the file
+        lines = []
+        try:
+            with open_file(self.filepath, "r") as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        break
+                    res = json.loads(line)
+                    lines.append(line)
+                    self.done.add(res["ID"])
+        except (EOFError, OSError, ValueError):
+            pass  # truncated stream or incomplete line
+        root, ext = os.path.splitext(self.filepath)
+        with open_file(root + ".tmp" + ext, "w", level=self.level) as f:
+            f.writelines(lines)
+        os.replace(root + ".tmp" + ext, self.filepath)
+
+    def write(self, res: dict):
+        line = json.dumps(res) + "\n"
+        with self.lock:
+            self.file.write(line)
+            self.done.add(res["ID"])
+            self.count += 1
+            self.last_id = res["ID"]
+            self.unsynced += 1
+            if self.unsynced >= self.sync_every or time.time() - self.last_sync >= self.sync_interval:
+                self._sync()
+
+    def _run(self):
+        # Sync the results that have been pending for sync_interval seconds
+        while not self._stop.wait(self.sync_interval):
+            with self.lock:
+                if self.unsynced and time.time() - self.last_sync >= self.sync_interval:
+                    self._sync()
+
+    def sync(self, complete=False):
+        """Flush and fsync the results and update the progress journal."""
+        with self.lock:
+            self._sync(complete)
+
+    def _sync(self, complete=False):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.unsynced = 0
+        self.last_sync = time.time()
+
+        journal = {"output": self.filepath, "done": self.count, "total": self.total, "last_ID": self.last_id,
+                   "complete": complete, "updated": self.last_sync}
+        with open(self.journalpath + ".tmp", "w") as f:
+            json.dump(journal, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(self.journalpath + ".tmp", self.journalpath)
+
+    def close(self, complete=True):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.sync(complete=complete)
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(complete=exc_type is None)
+
+
+def estimate_cost(chain: CEChain):
+    """Estimated analysis cost: number of jobs of the partitioning task per hyperperiod times number of tasks."""
+    return _estimate_cost([tsk.period for tsk in chain.tasks])
+
+
+def _estimate_cost(periods):
+    return math.lcm(*periods) // max(periods) * len(periods)
+
+
+def shard_jsonl(filepath: str, number_shards: int, directory: str, balance="count"):
+    """Split a JSONL file of chains deterministically into number_shards files <directory>/shard_<k>.jsonl.
+    - balance='count': round robin (equal number of chains per shard)
+    - balance='cost': greedy by estimated cost (largest chains first, each to the shard with the lowest total cost)
+    The lines are copied unchanged and keep their input order within each shard. A manifest (<directory>/manifest.json)
+    stores the IDs in input order and the shard of each chain, which is used by merge_results(). Returns the manifest.
+    The input is streamed twice (IDs and costs first, then the lines to the shards), so only the IDs, costs and shards
+    of the chains are kept in memory. Only JSONL files (possibly compressed, see open_file) are supported."""
+    ids = []
+    costs = []
+    seen = set()
+    duplicates = []
+    with open_file(filepath, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            chain_data = json.loads(line)
+            id = chain_data["ID"]
+            if id in seen:
+                duplicates.append(str(id))
+            seen.add(id)
+            ids.append(id)
+            costs.append(_estimate_cost([t["period"] for t in chain_data["tasks"]]))
+    if duplicates:
+        raise ValueError(f"Chain IDs must be unique for sharding, duplicates: {', '.join(duplicates)}")
+
+    if balance == "count":
+        assignment = [idx % number_shards for idx in range(len(ids))]
+    elif balance == "cost":
+        assignment = [None] * len(ids)
+        loads = [0] * number_shards
+        for idx in sorted(range(len(ids)), key=lambda i: (-costs[i], i)):
+            k = min(range(number_shards), key=lambda k: (loads[k], k))
+            assignment[idx] = k
+            loads[k] += costs[idx]
+    else:
+        raise ValueError(f'{balance} is not a possible balancing.')
+
+    os.makedirs(directory, exist_ok=True)
+    files = [f"shard_{k:03d}.jsonl" for k in range(number_shards)]
+    outputs = [open(os.path.join(directory, filename), "w") for filename in files]
+    try:
+        with open_file(filepath, "r") as f:
+            records = (line for line in f if line.strip())
+            for line, shard in zip(records, assignment):
+                outputs[shard].write(line if line.endswith("\n") else line + "\n")
+    finally:
+        for output in outputs:
+            output.close()
+
+    manifest = {
+        "input": filepath,
+        "shards": number_shards,
+        "balance": balance,
+        "files": files,
+        "chains_per_shard": [assignment.count(k) for k in range(number_shards)],
+        "cost_per_shard": [sum(c for c, shard in zip(costs, assignment) if shard == k) for k in range(number_shards)],
+        "ids": ids,
+        "shard_of": assignment,
+    }
+    with open(os.path.join(directory, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=4)
+    return manifest
+
+
+def merge_results(manifest_path: str, result_files: list[str], output: str):
+    """Merge the results of the shards (any number of JSONL files) into one file in the input order of the manifest.
+    Raises ValueError (and writes nothing) if results are missing, duplicated or do not belong to the manifest."""
+    with open(manifest_path, "r") as f:
+        manifest = json.load(f)
+    expected = set(manifest["ids"])
+
+    results = dict()
+    duplicates, unknown = [], []
+    for filepath in result_files:
+        with open_file(filepath, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                res = json.loads(line)
+                if res["ID"] not in expected:
+                    unknown.append(res["ID"])
+                elif res["ID"] in results:
+                    duplicates.append(res["ID"])
+                else:
+                    results[res["ID"]] = res
+    missing = [id for id in manifest["ids"] if id not in results]
+
+    errors = []
+    for name, ids in (("missing", missing), ("duplicated", duplicates), ("not in manifest", unknown)):
+        if ids:
+            errors.append(f"{len(ids)} {name} (e.g., {', '.join(str(id) for id in ids[:5])})")
+    if errors:
+        raise ValueError("Cannot merge results: " + "; ".join(errors))
+
+    ensure_filepath_exists(output)
+    with open_file(output, "w") as f:
+        for id in manifest["ids"]:
+            f.write(json.dumps(results[id]) + "\n")
+    return len(results)
+
+
 ##########
 # Analysis
 ##########
 
-def analyze(chain: CEChain, info=False, bound=None, relative_bound=None, timeout_sec=None):
+# Metrics reported by analyze(): name -> (prerequisites, function(chain, values, bound))
+METRICS = {
+    'MaxRT': ([], lambda chain, values, bound: maximumRT(chain)),
+    'MaxRedRT': (['MaxRT'], lambda chain, values, bound: values['MaxRT'] - chain.tasks[0].period),
+    'Reac': ([], lambda chain, values, bound: reactive(chain)),
+    'MinRT': ([], lambda chain, values, bound: minimumRT(chain)),
+    'AvRT': ([], lambda chain, values, bound: averageRT(chain)),
+    'throughp': ([], lambda chain, values, bound: throughput(chain)),
+    'mkRT': ([], lambda chain, values, bound: mkRT(chain, bound)),
+    'LE-RT': ([], lambda chain, values, bound: longestExceedanceRT(chain, bound)),
+}
+BOUND_METRICS = ['mkRT', 'LE-RT']  # Metrics that require a bound
+
+def plan_metrics(metrics=None, bound=None, relative_bound=None):
+    """Metrics to be computed (in the order of METRICS) for the requested metrics, including their prerequisites.
+    If metrics is None, all metrics are requested (the metrics in BOUND_METRICS only if a bound is given)."""
+    if metrics is None:
+        metrics = [m for m in METRICS if m not in BOUND_METRICS or bound or relative_bound]
+    for m in metrics:
+        if m not in METRICS:
+            raise ValueError(f'{m} is not a possible metric.')
+        if m in BOUND_METRICS and not (bound or relative_bound):
+            raise ValueError(f'{m} requires a bound or a relative bound.')
+
+    needed = set()
+    stack = list(metrics)
+    while stack:
+        m = stack.pop()
+        if m in needed:
+            continue
+        needed.add(m)
+        stack.extend(METRICS[m][0])
+        if m in BOUND_METRICS and relative_bound:
+            stack.append('MaxRT')  # relative bound is relative to MaxRT
+    return [m for m in METRICS if m in needed]
+
+def analyze(chain: CEChain, info=False, bound=None, relative_bound=None, timeout_sec=None, compress=True, metrics=None, check_maxrt=None, workers=None, anytime=False, out_of_core=None):
+    """Analyze the chain. Only the requested metrics (default: all) and their prerequisites are computed.
+    If check_maxrt is set, 'MaxRT<=check_maxrt' is reported as well; without other metrics, this check stops at the
+    first partitioned job chain that exceeds the limit and no anchor points are computed.
+    With workers > 1, the anchor points of chains with many jobs of the partitioning task are computed in parallel.
+    With anytime, the timeout only limits the enumeration of the partitioned job chains (checked cooperatively, no signal is used).
+    If it is exceeded, bounds on MaxRT, MinRT and AvRT are reported instead of the metrics (see AnytimeAnalysis).
+    With out_of_core (a directory, '' for the temporary directory), the anchor points are stored on disk (see AnchorStore)."""
 
     assert not (bound and relative_bound), "cannot specify bound and relative bound at the same time"
 
+    plan = plan_metrics(metrics, bound, relative_bound)
+    if metrics is None:
+        metrics = plan
+
     try:
-        if timeout_sec:
+        if timeout_sec and not anytime:
             signal.signal(signal.SIGALRM, _timeout_handler)
             signal.alarm(timeout_sec)
 
@@ -252,8 +1077,16 @@ def analyze(chain: CEChain, info=False, bound=None, relative_bound=None, timeout
             # hyperperiod/maxperiod
             results['H/Tp'] = chain.hyperperiod / max([tsk.period for tsk in chain.tasks])
 
-        if chain.anchorsRT is None:
-            chain.calc_anchors()
+        if anytime and chain.anchorsRT is None and (plan or info):
+            partial = AnytimeAnalysis(chain, compress=compress)
+            budget = None if not timeout_sec else timeout_sec - (time.time() - start_time)
+            if not partial.run(budget):
+                results.update(partial.bounds())
+                results['analysis_time_sec'] = time.time() - start_time
+                return results
+
+        if chain.anchorsRT is None and (plan or info):
+            chain.calc_anchors(compress=compress, workers=workers, out_of_core=out_of_core)
 
         # print("Anchors RT: ", chain.anchorsRT)
 
@@ -261,30 +1094,27 @@ def analyze(chain: CEChain, info=False, bound=None, relative_bound=None, timeout
             # Number of anchor points
             results['#AnchorsRT'] = len(chain.anchorsRT)-1
 
-        # Max RT
-        results['MaxRT'] = maximumRT(chain)
-        results['MaxRedRT'] = results['MaxRT'] - chain.tasks[0].period
-
-        results['Reac'] = reactive(chain)
-
-        # Min RT
-        results['MinRT'] = minimumRT(chain)
-
-        # Average
-        results['AvRT'] = averageRT(chain)
+            # Number of tasks after compression
+            results['#TasksCompressed'] = len(chain.compress().tasks) if compress else len(chain.tasks)
 
-        # Throughput
-        results['throughp'] = throughput(chain)
+            # How the anchor points were computed, and the structural properties of the chain (see CEChain.structure())
+            if chain.anchors_path is not None:
+                results['Path'] = chain.anchors_path
+            results['Structure'] = [name for name, holds in chain.structure().items() if holds]
 
-        if relative_bound:
-            bound = relative_bound * results["MaxRT"] 
-            # bound = relative_bound * (results["MaxRT"] - chain.tasks[0].period )
+        values = dict()
+        for m in plan:
+            if m in BOUND_METRICS and relative_bound:
+                bound = relative_bound * values["MaxRT"]
+                # bound = relative_bound * (values["MaxRT"] - chain.tasks[0].period )
+            values[m] = METRICS[m][1](chain, values, bound)
 
-        if bound:
-            results['mkRT'] = mkRT(chain, bound)
-
-            results['LE-RT'] = longestExceedanceRT(chain, bound)
+        for m in plan:
+            if m in metrics:
+                results[m] = values[m]
 
+        if check_maxrt is not None:
+            results[f'MaxRT<={check_maxrt:g}'] = checkMaxRT(chain, check_maxrt, compress=compress)
 
         end_time = time.time()
         results['analysis_time_sec'] = end_time - start_time
@@ -297,11 +1127,116 @@ def analyze(chain: CEChain, info=False, bound=None, relative_bound=None, timeout
 
     return results
 
+def checkMaxRT(chain: CEChain, limit, compress=True):
+    """Check whether MaxRT <= limit. If no anchor points are available, the partitioned job chains are enumerated
+    until the first one exceeds the limit."""
+    if chain.anchorsRT is not None:
+        return maximumRT(chain) <= limit
+    if chain.hyperperiod is None:
+        chain.calc_hyperperiod()
+
+    reduced = chain.compress() if compress else chain
+    reduced.hyperperiod = chain.hyperperiod
+    for partstart, partend in reduced.iter_parts():
+        if partend - partstart > limit:
+            return False
+    return True
+
+class AnytimeAnalysis:
+    """Incremental enumeration of the partitioned job chains of a chain (over the first hyperperiod).
+    run() continues the enumeration for a time budget, and bounds() returns guaranteed bounds on MaxRT, MinRT and AvRT
+    that become tighter the more jobs have been enumerated (and exact once the enumeration is complete).
+
+    The reaction time between two consecutive (merged) entries (x, y), (x', y') is y - (t - x) for t in [x, x'),
+    so the enumerated part is known exactly. For the remaining part, the analytical bounds are used:
+    every partitioned job chain spans all deadlines and one period of the partitioning task p (RT >= sum(D) + T_p),
+    the reaction time never drops below sum(D), and it is at most sum(T + D) (minus n-1 for integer parameters)."""
+
+    def __init__(self, chain: CEChain, compress=True):
+        self.chain = chain
+        if chain.hyperperiod is None:
+            chain.calc_hyperperiod()
+        # The compressed chain has the same anchor points modulo the hyperperiod
+        self.reduced = chain.compress() if compress else chain
+        self.reduced.hyperperiod = chain.hyperperiod
+        self.p, self.jobs = self.reduced._partjobs()
+        self.done = 0  # number of enumerated jobs of the partitioning task
+
+        self.reducer = _AnchorReducer()
+        self.first = None  # first entry
+        self.pending = None  # last entry (may still be merged)
+        self.maxY = None
+        self.minYhat = None
+        self.integral = 0  # integral of the reaction time over [first x, pending x)
+
+        tasks = self.reduced.tasks
+        self.sumD = sum(tsk.deadline for tsk in tasks)
+        self.lowerMaxRT = self.sumD + tasks[self.p].period
+        self.upperMaxRT = sum(tsk.period + tsk.deadline for tsk in tasks)
+        if all(isinstance(v, int) for tsk in tasks for v in (tsk.phase, tsk.period, tsk.deadline)):
+            self.upperMaxRT -= len(tasks) - 1
+
+    def _interval(self, entry, nextx):
+        # Add the interval [entry x, nextx) with reaction time decreasing from entry y with slope -1
+        gap = nextx - entry[0]
+        yhat = entry[1] - gap
+        self.integral += gap * (entry[1] + yhat) / 2
+        self.minYhat = yhat if self.minYhat is None else min(self.minYhat, yhat)
+
+    def _add(self, x, y):
+        self.reducer.add(x, y)
+        self.maxY = y if self.maxY is None else max(self.maxY, y)
+        if self.pending is not None and self.pending[0] == x:
+            self.pending = (x, max(self.pending[1], y))
+            return
+        if self.pending is not None:
+            self._interval(self.pending, x)
+        else:
+            self.first = (x, y)
+        self.pending = (x, y)
+
+    def complete(self):
+        return self.done == len(self.jobs)
+
+    def run(self, budget_sec=None, check_every=256):
+        """Continue the enumeration for (approximately) budget_sec seconds (no limit if None).
+        Returns True if the enumeration is complete; then the anchor points of the chain are stored."""
+        deadline = None if budget_sec is None else time.time() + budget_sec
+        while not self.complete():
+            stop = min(self.done + check_every, len(self.jobs))
+            for jobidx in self.jobs[self.done:stop]:
+                partstart, partend = self.reduced._partbounds(self.p, jobidx)
+                self._add(partstart, partend - partstart)
+            self.done = stop
+            if deadline is not None and time.time() >= deadline and not self.complete():
+                return False
+
+        if self.chain.anchorsRT is None:
+            anchors = self.reducer.finish(self.chain.hyperperiod)
+            self.chain.anchorsRT = anchors if self.reduced is self.chain else self.chain._align_anchors(anchors)
+        return True
+
+    def bounds(self):
+        """Lower and upper bounds on MaxRT, MinRT and AvRT, and the fraction of enumerated jobs."""
+        if self.complete():
+            maxrt, minrt, avrt = maximumRT(self.chain), minimumRT(self.chain), averageRT(self.chain)
+            return {'MaxRT_bounds': [maxrt, maxrt], 'MinRT_bounds': [minrt, minrt], 'AvRT_bounds': [avrt, avrt], 'coverage': 1.0}
+
+        maxrt = [self.lowerMaxRT if self.maxY is None else max(self.lowerMaxRT, self.maxY), self.upperMaxRT]
+        minrt = [self.sumD, self.upperMaxRT if self.minYhat is None else self.minYhat]
+        # Exact integral over the enumerated part, bounds for the rest of the hyperperiod
+        hyperperiod = self.chain.hyperperiod
+        covered = 0 if self.pending is None else self.pending[0] - self.first[0]
+        avrt = [(self.integral + (hyperperiod - covered) * minrt[0]) / hyperperiod,
+                (self.integral + (hyperperiod - covered) * maxrt[1]) / hyperperiod]
+        return {'MaxRT_bounds': maxrt, 'MinRT_bounds': minrt, 'AvRT_bounds': avrt, 'coverage': self.done / len(self.jobs)}
+
+
 def maximumRT(chain: CEChain):
     '''Maximum Reaction Time (MRT/MaxRT)'''
     if chain.anchorsRT is None:
         chain.calc_anchors()
-    return max([y for x,y in chain.anchorsRT])
+    return max(max([y for x,y in anchors]) for anchors in anchor_chunks(chain.anchorsRT))
 
 def minimumRT(chain: CEChain):
     '''Minimum Reaction Time (MinRT)'''
@@ -309,16 +1244,17 @@ def minimumRT(chain: CEChain):
         chain.calc_anchors()
     
     minRT = None
-    for idx in range(len(chain.anchorsRT) - 1):
-        currentX, currentY = chain.anchorsRT[idx]
-        nextX, nextY = chain.anchorsRT[idx+1]
+    for anchors in anchor_chunks(chain.anchorsRT):
+        for idx in range(len(anchors) - 1):
+            currentX, currentY = anchors[idx]
+            nextX, nextY = anchors[idx+1]
 
-        rt = currentY - (nextX - currentX)
+            rt = currentY - (nextX - currentX)
 
-        if minRT == None:
-            minRT = rt
-        else:
-            minRT = min(minRT, rt)
+            if minRT == None:
+                minRT = rt
+            else:
+                minRT = min(minRT, rt)
     return minRT
 
 def reactive(chain: CEChain):
@@ -327,16 +1263,17 @@ def reactive(chain: CEChain):
         chain.calc_anchors()
     
     reac = None
-    for idx in range(len(chain.anchorsRT) - 1):
-        currentX, currentY = chain.anchorsRT[idx]
-        nextX, nextY = chain.anchorsRT[idx+1]
+    for anchors in anchor_chunks(chain.anchorsRT):
+        for idx in range(len(anchors) - 1):
+            currentX, currentY = anchors[idx]
+            nextX, nextY = anchors[idx+1]
 
-        rt = currentY - (nextX - currentX)
+            rt = currentY - (nextX - currentX)
 
-        if reac == None:
-            reac = rt
-        else:
-            reac = max(reac, rt)
+            if reac == None:
+                reac = rt
+            else:
+                reac = max(reac, rt)
 
     reac += chain.tasks[0].period
     return reac
@@ -347,13 +1284,14 @@ def averageRT(chain: CEChain):
         chain.calc_anchors()
     
     avRT = 0
-    for idx in range(len(chain.anchorsRT)-1):
-        currentX, currentY = chain.anchorsRT[idx]
-        nextX, nextY = chain.anchorsRT[idx+1]
+    for anchors in anchor_chunks(chain.anchorsRT):
+        for idx in range(len(anchors)-1):
+            currentX, currentY = anchors[idx]
+            nextX, nextY = anchors[idx+1]
 
-        yHat = currentY - (nextX - currentX)
+            yHat = currentY - (nextX - currentX)
 
-        avRT = avRT + ((nextX - currentX) * (currentY + yHat))
+            avRT = avRT + ((nextX - currentX) * (currentY + yHat))
 
     if chain.hyperperiod is None:
         chain.calc_hyperperiod()
@@ -371,113 +1309,129 @@ def throughput(chain: CEChain):
     # Note: right anchor point is removed as described in the analysis (since first and last anchor point are exactly one hyperperiod apart)
     return (len(chain.anchorsRT) -1) / chain.hyperperiod
 
+def _fail_pass_counts(chain: CEChain, bound):
+    # For each anchor point: (number of failing jobs, 'F') and (number of passing jobs, 'P') of the first task until the next anchor point
+    T1 = chain.tasks[0].period
+    for anchors in anchor_chunks(chain.anchorsRT):
+        for i in range(len(anchors) - 1):
+            x_i, y_i = anchors[i]
+            x_next, _ = anchors[i + 1]
+
+            assert (x_next - x_i) // T1 == (x_next - x_i) / T1 # Make sure that anchors are actually integer multiples
+            N_anc = (x_next - x_i) // T1
+            N_fail = min(math.ceil((y_i - (bound + T1)) / T1), N_anc)
+            N_fail = max(N_fail,0)  # corner case with very large bound
+            yield (N_fail, 'F')
+            yield (N_anc - N_fail, 'P')
+
 def mkRT(chain: CEChain, bound):
     """Weakly hard chain-level (m,k) constraints for Reaction time. 
-    Returns the (m,k) constraints with the smallest m which are satisfied for bound with k specified in MKRange."""
+    Returns the (m,k) constraints with the smallest m which are satisfied for bound with k specified in MKRange.
+    The fail/pass counts are processed in one pass with a window of the next MKRange[1] jobs (the first counts are
+    repeated after the hyperperiod), so only this window is kept in memory."""
     if chain.anchorsRT is None:
         chain.calc_anchors()
     if chain.hyperperiod is None:
         chain.calc_hyperperiod()
-    
-    FP_list = []
-    length = 0
-    anchors = chain.anchorsRT
-    T1 = chain.tasks[0].period
-    hyperperiod = chain.hyperperiod
 
-    for i in range(len(anchors) - 1):
-        x_i, y_i = anchors[i]
-        x_next, _ = anchors[i + 1]
-
-        assert (x_next - x_i) // T1 == (x_next - x_i) / T1 # Make sure that anchors are actually integer multiples
-        N_anc = (x_next - x_i) // T1
-        N_fail = min(math.ceil((y_i - (bound + T1)) / T1), N_anc)
-        N_fail = max(N_fail,0)  # corner case with very large bound
-        FP_list.append((N_fail, 'F'))
-        FP_list.append((N_anc - N_fail, 'P'))
-        length += N_anc
-    original_length = len(FP_list)
-
-    i = 0
-    while length < (hyperperiod / T1) + MKRange[1]:
-        FP_list.append(FP_list[i])
-        length += FP_list[i][0]
-        i += 1
-
-    # Construct results vector
+    K = MKRange[1]
     mk_results = [0 for k in range(MKRange[0],MKRange[1]+1)]
-    for idx in range(original_length):
-        if FP_list[idx][1] == 'F':
-            # Start a new iteration
-            for k in range(MKRange[0], MKRange[1] + 1):
-                misses = 0
-                total_count = 0
-                j = idx
-                while total_count < k:
-                    nextNumber, nextFP = FP_list[j]
-                    if nextNumber >= k - total_count:
-                        nextNumber = k - total_count
-                    total_count += nextNumber
-                    if nextFP == 'F':
-                        misses += nextNumber
-                    j += 1
-                
-                mk_results[k - MKRange[0]] = max(mk_results[k - MKRange[0]], misses)
+
+    def evaluate(FP_window):
+        # Misses in the next k jobs, starting with the first entry of the window
+        for k in range(MKRange[0], MKRange[1] + 1):
+            misses = 0
+            total_count = 0
+            for nextNumber, nextFP in FP_window:
+                if total_count >= k:
+                    break
+                if nextNumber >= k - total_count:
+                    nextNumber = k - total_count
+                total_count += nextNumber
+                if nextFP == 'F':
+                    misses += nextNumber
+
+            mk_results[k - MKRange[0]] = max(mk_results[k - MKRange[0]], misses)
+
+    FP_window = collections.deque()  # entries from the first entry that is not evaluated yet
+    window_length = 0  # number of jobs in the window
+    FP_head = []  # first entries with at least K jobs (repeated after the hyperperiod)
+    head_length = 0
+    for entry in _fail_pass_counts(chain, bound):
+        if head_length < K:
+            FP_head.append(entry)
+            head_length += entry[0]
+        FP_window.append(entry)
+        window_length += entry[0]
+        while window_length >= K:
+            if FP_window[0][1] == 'F':
+                evaluate(FP_window)
+            window_length -= FP_window.popleft()[0]
+
+    # Remaining entries, followed by the repetition of the first entries
+    remaining = len(FP_window)
+    length = 0
+    for entry in itertools.cycle(FP_head):
+        if length >= K:
+            break
+        FP_window.append(entry)
+        length += entry[0]
+    for _ in range(remaining):
+        if FP_window[0][1] == 'F':
+            evaluate(FP_window)
+        FP_window.popleft()
 
     return list(zip(mk_results,list(range(MKRange[0],MKRange[1]+1))))
 
 def longestExceedanceRT(chain: CEChain, bound):
-    """Longest Consecutive Exceedance for Reaction Time (LE_{RT}) for a given bound."""
+    """Longest Consecutive Exceedance for Reaction Time (LE_{RT}) for a given bound.
+    The exceedance intervals are merged in one pass; the last merged interval can continue with the first one in the next hyperperiod."""
     if chain.anchorsRT is None:
         chain.calc_anchors()
     if chain.hyperperiod is None:
         chain.calc_hyperperiod()
 
     assert chain.anchorsRT[0][0] + chain.hyperperiod == chain.anchorsRT[-1][0]
+    hyperperiod = chain.hyperperiod
 
-    # Determine exceedance intervals
-    exceedance_intervals = []
-    for idx in range(len(chain.anchorsRT)-1):
-        currentX, currentY = chain.anchorsRT[idx]
-        nextX, nextY = chain.anchorsRT[idx+1]
-
-        if currentY > bound:
-            exceedance_intervals.append((currentX, currentX + min(currentY - bound, nextX - currentX)))
-    
-    # Extend to two hyperperiods
-    extended = exceedance_intervals[:]
-    for start,finish in exceedance_intervals:
-        extended.append((start + chain.hyperperiod, finish + chain.hyperperiod))    
-    exceedance_intervals = extended
-    
-    # Merge exceedance intervals
-    merged_exceedance_intervals = []
-
-    if len(exceedance_intervals) <= 1:
-        merged_exceedance_intervals = exceedance_intervals
-    else:
-        current_start, current_end = exceedance_intervals[0]
-        for idx in range(1,len(exceedance_intervals)):
-            next_start, next_end = exceedance_intervals[idx]
-
-            if current_end == next_start:
-                # merge interval
-                current_end = next_end
-            
-            else:
-                # append and start new interval
-                merged_exceedance_intervals.append((current_start, current_end))
-                current_start, current_end = next_start, next_end
-        
-        # Add last interval after finishing loop
-        merged_exceedance_intervals.append((current_start, current_end))
-
-    
-    # Calculate longest interval
-    longest = max([0] + [end-start for start,end in merged_exceedance_intervals])
-    if longest == 2* chain.hyperperiod:
-        longest = math.inf
-    
+    def length(start, end):
+        # Length of a merged interval, also in the next hyperperiod (same as for the intervals extended to two hyperperiods)
+        return max(end - start, (end + hyperperiod) - (start + hyperperiod))
+
+    # Determine and merge exceedance intervals
+    first = None  # first merged interval
+    current = None  # current merged interval
+    longest = 0
+    for anchors in anchor_chunks(chain.anchorsRT):
+        for idx in range(len(anchors)-1):
+            currentX, currentY = anchors[idx]
+            nextX, nextY = anchors[idx+1]
+
+            if currentY > bound:
+                start, finish = currentX, currentX + min(currentY - bound, nextX - currentX)
+                if current is not None and current[1] == start:
+                    # merge interval
+                    current = (current[0], finish)
+                else:
+                    # finish interval and start new interval
+                    if current is not None:
+                        if first is None:
+                            first = current
+                        longest = max(longest, length(*current))
+                    current = (start, finish)
+
+    if current is None:
+        return 0
+    if first is None:
+        # Only one interval: exceedance in the whole hyperperiod if it continues in the next hyperperiod
+        if current[1] == current[0] + hyperperiod:
+            return math.inf
+        return length(*current)
+
+    longest = max(longest, length(*current))
+    if current[1] == first[0] + hyperperiod:
+        # The last interval continues with the first interval of the next hyperperiod
+        longest = max(longest, (first[1] + hyperperiod) - current[0])
     return longest
 
 
@@ -485,46 +1439,189 @@ def longestExceedanceRT(chain: CEChain, bound):
 # Main
 ##########
 
-def main():
-    parser = argparse.ArgumentParser(description="Analyze CEChains from JSONL file.")
+def shard_main(argv):
+    parser = argparse.ArgumentParser(prog="analysis.py shard", description="Split a JSONL file of CEChains into shards, e.g., for the analysis on multiple nodes.")
     parser.add_argument("input", help="Input file (.jsonl)")
+    parser.add_argument("-n", "--shards", type=int, required=True, help="Number of shards")
+    parser.add_argument("-d", "--directory", required=True, help="Output directory for the shards and the manifest")
+    parser.add_argument("--balance", choices=["count", "cost"], default="count", help="Balance the number of chains (round robin) or the estimated analysis cost (H/Tp * number of tasks) (default: count)")
+    args = parser.parse_args(argv)
+
+    try:
+        manifest = shard_jsonl(args.input, args.shards, args.directory, balance=args.balance)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    for filename, number, cost in zip(manifest["files"], manifest["chains_per_shard"], manifest["cost_per_shard"]):
+        print(f"{os.path.join(args.directory, filename)}: {number} chains, estimated cost {cost}")
+
+
+def merge_main(argv):
+    parser = argparse.ArgumentParser(prog="analysis.py merge", description="Merge the results of the shards in the input order.")
+    parser.add_argument("manifest", help="Manifest of the shards (manifest.json)")
+    parser.add_argument("results", nargs="+", help="Result files of the shards (.jsonl)")
+    parser.add_argument("-o", "--output", required=True, help="Output file for the merged results (.jsonl)")
+    args = parser.parse_args(argv)
+
+    try:
+        number = merge_results(args.manifest, args.results, args.output)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print(f"Merged {number} results into: {args.output}")
+
+
+def query_main(argv):
+    parser = argparse.ArgumentParser(prog="analysis.py query", description="Compute metrics from stored shapes (see --save-shapes) without recalculating the anchor points.")
+    parser.add_argument("input", help="Input file with shapes (.jsonl)")
     parser.add_argument("-o", "--output", help="Output file to save results (optional)")
     parser.add_argument("--no-print", action="store_true", help="Do not print results to stdout")
     parser.add_argument("-b", "--bound", type=float, help="If set, perform (m,k) and longest exceedance analysis with the given bound")
     parser.add_argument("-rb", "--relative-bound", type=float, help="If set, perform (m,k) and longest exceedance analysis with the given relative bound (relative_bound * MaxRT)")
     parser.add_argument("-i", "--info", action="store_true", help="Store additional information such as number of anchor points in the results vector.")
-    parser.add_argument("-t", "--timeout", type=int, help="Set a timeout in seconds.")
-
-    args = parser.parse_args()
+    parser.add_argument("-m", "--metrics", nargs="*", choices=list(METRICS.keys()), help="Only compute (and report) these metrics (default: all)")
+    parser.add_argument("--check-maxrt", type=float, help="Report whether MaxRT does not exceed this value (as 'MaxRT<=value').")
+    args = parser.parse_args(argv)
 
     if args.bound is not None and args.relative_bound is not None:
         print("Error: You cannot specify both --bound and --relative-bound at the same time.")
         sys.exit(1)
+    try:
+        plan_metrics(args.metrics, args.bound, args.relative_bound)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
 
-    # Check output folder
-    if args.output:
-        ensure_filepath_exists(args.output)
-
-    # Load
-    chains = load_chains_from_jsonl(args.input)
-
-    # Analyze
+    chains = load_shapes_from_jsonl(args.input)
     results = []
     for chain in chains:
         res = dict()
         res["ID"] = chain.id
-        res.update(analyze(chain, info=args.info, bound=args.bound, relative_bound=args.relative_bound, timeout_sec=args.timeout))
+        res.update(analyze(chain, info=args.info, bound=args.bound, relative_bound=args.relative_bound,
+                           metrics=args.metrics, check_maxrt=args.check_maxrt))
         results.append(res)
-
-        # Print
         if not args.no_print:
             print(json.dumps(res))
 
-    
     if args.output:
-        with open(args.output, "w") as f:
+        ensure_filepath_exists(args.output)
+        with open_file(args.output, "w") as f:
             for r in results:
                 f.write(json.dumps(r) + "\n")
 
+
+def main():
+    # Subcommands
+    if len(sys.argv) > 1 and sys.argv[1] == "query":
+        return query_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == "shard":
+        return shard_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == "merge":
+        return merge_main(sys.argv[2:])
+
+    parser = argparse.ArgumentParser(description="Analyze CEChains from JSONL file. Subcommands: 'query' computes metrics from stored shapes, 'shard' and 'merge' split the input and combine the results for distributed runs (see, e.g., 'analysis.py query -h').")
+    parser.add_argument("input", help="Input file (.jsonl, or compressed .jsonl.gz/.bz2/.xz)")
+    parser.add_argument("-o", "--output", help="Output file to save results (optional, compressed for .gz/.bz2/.xz)")
+    parser.add_argument("--compression-level", type=int, help="Compression level for compressed output files (gz, bz2: 1-9, xz: 0-9; default: 6, 9, 6)")
+    parser.add_argument("--no-print", action="store_true", help="Do not print results to stdout")
+    parser.add_argument("--resume", action="store_true", help="Keep the results already stored in the output file and only analyze chains with other IDs")
+    selection = parser.add_mutually_exclusive_group()
+    selection.add_argument("--ids", nargs="+", metavar="ID", help="Only analyze the chains with these IDs (read directly using the ID index <input>.idx)")
+    selection.add_argument("--id-range", nargs=2, metavar=("FIRST", "LAST"), help="Only analyze the chains from ID FIRST to ID LAST in file order (read directly using the ID index <input>.idx)")
+    parser.add_argument("--save-shapes", help="Output file to save the shapes (anchor points etc.) of the analyzed chains for later queries (.jsonl, optional, see 'analysis.py query -h')")
+    parser.add_argument("-b", "--bound", type=float, help="If set, perform (m,k) and longest exceedance analysis with the given bound")
+    parser.add_argument("-rb", "--relative-bound", type=float, help="If set, perform (m,k) and longest exceedance analysis with the given relative bound (relative_bound * MaxRT)")
+    parser.add_argument("-i", "--info", action="store_true", help="Store additional information such as number of anchor points in the results vector.")
+    parser.add_argument("-t", "--timeout", type=int, help="Set a timeout in seconds.")
+    parser.add_argument("--no-compress", action="store_true", help="Do not merge adjacent tasks with harmonic periods before the analysis.")
+    parser.add_argument("--anytime", action="store_true", help="With --timeout: if the timeout is exceeded, report bounds on MaxRT, MinRT and AvRT from the partial analysis instead of no results.")
+    parser.add_argument("-w", "--workers", type=int, help=f"Compute the anchor points of a chain with at least {2*MinJobsPerSegment} jobs of the partitioning task (per hyperperiod) with this number of parallel processes.")
+    parser.add_argument("-m", "--metrics", nargs="*", choices=list(METRICS.keys()), help="Only compute (and report) these metrics (default: all)")
+    parser.add_argument("--check-maxrt", type=float, help="Report whether MaxRT does not exceed this value (as 'MaxRT<=value'). Stops at the first exceeding job chain if no other metric is requested ('--metrics' without arguments).")
+    parser.add_argument("--out-of-core", nargs="?", const="", metavar="DIR", help="Store the anchor points of each chain in a memory-mapped file in DIR (default: temporary directory) instead of in memory, for chains whose anchor points do not fit in memory")
+    parser.add_argument("--progress", type=float, nargs="?", const=10.0, metavar="SEC", help="Print a progress line (chains done, chains/s, ETA, current and slowest chain, timeouts, peak RSS) to stderr every SEC seconds (default: 10)")
+    parser.add_argument("--status-file", help="Periodically write the progress as JSON to this file (optional)")
+    parser.add_argument("--prom-file", help="Periodically write the progress in the Prometheus text format to this file (optional, e.g., for the node exporter textfile collector)")
+
+    args = parser.parse_args()
+
+    if args.bound is not None and args.relative_bound is not None:
+        print("Error: You cannot specify both --bound and --relative-bound at the same time.")
+        sys.exit(1)
+    if args.resume and not args.output:
+        print("Error: --resume requires --output.")
+        sys.exit(1)
+    if args.out_of_core and not os.path.isdir(args.out_of_core):
+        print(f"Error: The directory for --out-of-core does not exist: {args.out_of_core}")
+        sys.exit(1)
+
+    try:
+        plan_metrics(args.metrics, args.bound, args.relative_bound)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    # Load
+    try:
+        chains = load_chains_from_jsonl(args.input, ids=args.ids, id_range=args.id_range)
+    except KeyError as e:
+        print(f"Error: {e.args[0]}")
+        sys.exit(1)
+
+    # Output (results are appended and synced periodically)
+    writer = None
+    if args.output:
+        writer = ResultWriter(args.output, resume=args.resume, total=len(chains), level=args.compression_level)
+        if args.resume:
+            chains = [chain for chain in chains if chain.id not in writer.done]
+
+    shapes_file = None
+    if args.save_shapes:
+        ensure_filepath_exists(args.save_shapes)
+        shapes_file = open_file(args.save_shapes, "a" if args.resume else "w", level=args.compression_level)
+
+    # Telemetry
+    progress = None
+    if args.progress is not None or args.status_file or args.prom_file:
+        progress = Progress(total=len(chains), interval=args.progress or 10.0,
+                            stream=sys.stderr if args.progress is not None else None,
+                            status_file=args.status_file, prom_file=args.prom_file).start()
+
+    # Analyze
+    complete = False
+    try:
+        for chain in chains:
+            if progress is not None:
+                progress.begin(chain)
+            res = dict()
+            res["ID"] = chain.id
+            res.update(analyze(chain, info=args.info, bound=args.bound, relative_bound=args.relative_bound, timeout_sec=args.timeout, compress=not args.no_compress,
+                               metrics=args.metrics, check_maxrt=args.check_maxrt, workers=args.workers,
+                               anytime=args.anytime, out_of_core=args.out_of_core))
+            if progress is not None:
+                # Timeout: only the runtime is reported (or bounds in anytime mode)
+                progress.end(chain, timeout=bool(args.timeout) and ('coverage' in res or res['analysis_time_sec'] == args.timeout))
+            if writer is not None:
+                writer.write(res)
+            if shapes_file is not None and chain.anchorsRT is not None:
+                shapes_file.write(json.dumps(shape_record(chain)) + "\n")
+
+            # Print
+            if not args.no_print:
+                print(json.dumps(res))
+
+            if isinstance(chain.anchorsRT, AnchorStore):
+                # Remove the out-of-core anchor points of the analyzed chain
+                chain.anchorsRT.close()
+                chain.anchorsRT = None
+        complete = True
+    finally:
+        if progress is not None:
+            progress.stop()
+        if writer is not None:
+            writer.close(complete=complete)
+        if shapes_file is not None:
+            shapes_file.close()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,157 @@
+"""asyncio interface of the analysis, e.g., for embedding in asynchronous services.
+
+analyze() blocks and implements timeouts with signal.alarm, which is only possible in the main thread. Here, the
+analysis is offloaded to an executor:
+- ProcessPoolExecutor (default): analyze() runs in the main thread of a worker process, so the deadline of a call
+  is also passed to analyze() as timeout (the worker stops via signal.alarm). The computed features of the chain
+  (hyperperiod, warmup, anchor points) are copied back to the chain of the caller.
+- ThreadPoolExecutor: no signals are used. With a deadline, analyze() runs in anytime mode, i.e., the enumeration
+  of the job chains stops cooperatively at the deadline (see AnytimeAnalysis) and the bounds of the partial analysis
+  are returned. The await is given AnytimeGraceSec beyond the deadline to receive them.
+Deadlines are enforced with asyncio.timeout, and cancellation propagates to the awaiting coroutines (work that has
+already started in an executor is stopped by the mechanisms above).
+
+Example usage:
+- results = asyncio.run(analyze_many_async(chains, max_concurrency=8, timeout=10, relative_bound=0.9))
+- python3 async_analysis.py chains.jsonl --executor thread --timeout 1 (chains that exceed the timeout
+  are reported with MaxRT_bounds, MinRT_bounds, AvRT_bounds and coverage)
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import functools
+import json
+import math
+import os
+import sys
+
+from analysis import CEChain, analyze, load_chains_from_jsonl, ensure_filepath_exists
+
+AnytimeGraceSec = 1  # time for an anytime analysis to return its bounds after the deadline (thread executor)
+
+_default_executor = None
+
+
+def get_default_executor():
+    """Process pool shared by all calls without an explicit executor (created on first use)."""
+    global _default_executor
+    if _default_executor is None:
+        _default_executor = concurrent.futures.ProcessPoolExecutor()
+    return _default_executor
+
+
+def shutdown_default_executor():
+    global _default_executor
+    if _default_executor is not None:
+        _default_executor.shutdown(cancel_futures=True)
+        AnytimeGraceSec = 1  # time for an anytime analysis to return its bounds after the deadline (thread executor)
+
+_default_executor = None
+
+
+def _analyze_in_process(chain: CEChain, kwargs):
+    # Runs in the worker process: return the results and the computed features of the chain
+    results = analyze(chain, **kwargs)
+    return results, (chain.hyperperiod, chain.warmup, chain.starttimes, chain.anchorsRT)
+
+
+async def analyze_async(chain: CEChain, executor=None, timeout=None, **kwargs):
+    """Analyze the chain in the executor (default: shared process pool) without blocking the event loop.
+    kwargs are passed to analyze(). Raises TimeoutError if the analysis does not finish within timeout seconds.
+    With a ThreadPoolExecutor, an analysis that exceeds the timeout returns the bounds of the anytime analysis
+    instead (TimeoutError only if these are not returned within AnytimeGraceSec after the timeout)."""
+    executor = executor or get_default_executor()
+    in_process = isinstance(executor, concurrent.futures.ProcessPoolExecutor)
+    kwargs = dict(kwargs)
+    deadline = timeout
+    if in_process:
+        if timeout is not None and not kwargs.get('timeout_sec'):
+            kwargs['timeout_sec'] = max(1, math.ceil(timeout))
+    else:
+        if timeout is not None and not kwargs.get('timeout_sec'):
+            kwargs['timeout_sec'] = timeout
+        if kwargs.get('timeout_sec'):
+            kwargs['anytime'] = True  # signal.alarm is not possible outside of the main thread
+        if timeout is not None:
+            deadline = timeout + AnytimeGraceSec  # the anytime analysis stops at timeout and returns its bounds
+
+    loop = asyncio.get_running_loop()
+    async with asyncio.timeout(deadline):
+        if in_process:
+            results, features = await loop.run_in_executor(executor, _analyze_in_process, chain, kwargs)
+            chain.hyperperiod, chain.warmup, chain.starttimes, chain.anchorsRT = features
+        else:
+            results = await loop.run_in_executor(executor, functools.partial(analyze, chain, **kwargs))
+    return results
+
+
+async def analyze_many_async(chains: list[CEChain], executor=None, max_concurrency=None, timeout=None, on_result=None, **kwargs):
+    """Analyze the chains with at most max_concurrency (default: number of CPUs) analyses at the same time.
+    Returns the results (with "ID", as in analysis.py) in the order of the chains. The timeout applies to each
+    chain separately (from the start of its analysis); a chain that exceeds it gets only 'analysis_time_sec', as with analyze()
+    (with a ThreadPoolExecutor, the bounds of the anytime analysis as well, see analyze_async()).
+    on_result is an optional callback for each result as soon as it is available."""
+    executor = executor or get_default_executor()
+    limit = asyncio.Semaphore(max_concurrency or os.cpu_count())
+
+    async def analyze_one(chain):
+        async with limit:
+            res = dict()
+            res["ID"] = chain.id
+            try:
+                res.update(await analyze_async(chain, executor=executor, timeout=timeout, **kwargs))
+            except TimeoutError:
+                res['analysis_time_sec'] = timeout
+            if on_result is not None:
+                on_result(res)
+            return res
+
+    return await asyncio.gather(*(analyze_one(chain) for chain in chains))
+
+
+##########
+# Main
+##########
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze CEChains from JSONL file with the asyncio interface.")
+    parser.add_argument("input", help="Input file (.jsonl)")
+    parser.add_argument("-o", "--output", help="Output file to save results (optional)")
+    parser.add_argument("--no-print", action="store_true", help="Do not print results to stdout")
+    parser.add_argument("--executor", choices=["process", "thread"], default="process", help="Executor for the analyses (default: process)")
+    parser.add_argument("--workers", type=int, help="Number of processes or threads of the executor (default: number of CPUs)")
+    parser.add_argument("--concurrency", type=int, help="Maximal number of concurrent analyses (default: number of CPUs)")
+    parser.add_argument("-b", "--bound", type=float, help="If set, perform (m,k) and longest exceedance analysis with the given bound")
+    parser.add_argument("-rb", "--relative-bound", type=float, help="If set, perform (m,k) and longest exceedance analysis with the given relative bound (relative_bound * MaxRT)")
+    parser.add_argument("-i", "--info", action="store_true", help="Store additional information such as number of anchor points in the results vector.")
+    parser.add_argument("-t", "--timeout", type=float, help="Set a timeout in seconds (per chain).")
+
+    args = parser.parse_args()
+
+    if args.bound is not None and args.relative_bound is not None:
+        print("Error: You cannot specify both --bound and --relative-bound at the same time.")
+        sys.exit(1)
+
+    chains = load_chains_from_jsonl(args.input)
+
+    if args.executor == "process":
+        executor = concurrent.futures.ProcessPoolExecutor(args.workers)
+    else:
+        executor = concurrent.futures.ThreadPoolExecutor(args.workers)
+
+    on_result = None if args.no_print else (lambda res: print(json.dumps(res)))
+    with executor:
+        results = asyncio.run(analyze_many_async(chains, executor=executor, max_concurrency=args.concurrency,
+                                                 timeout=args.timeout, on_result=on_result, info=args.info,
+                                                 bound=args.bound, relative_bound=args.relative_bound))
+
+    if args.output:
+        ensure_filepath_exists(args.output)
+        with open(args.output, "w") as f:
+            for r in results:
+                f.write(json.dumps(r) + "\n")
+
+
+if __name__ == "__main__":
+    main()
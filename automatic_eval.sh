@@ -56,11 +56,7 @@ python3 -c "import json; total = sum(json.loads(line).get('P_TIME', 0) for line
 
 # Check that results match
 echo "= Check that results match"
-python3 -c "import json; results_our = [json.loads(line).get('MaxRT') for line in open('AutomaticEval/CaseStudies/results.jsonl')]; results_other = [json.loads(line).get('FW_MRT') for line in open('AutomaticEval/CaseStudies/results_other.jsonl')]; print(f'- FW differs in {sum([res1 != res2 for res1, res2 in zip(results_our, results_other)])} cases')"
-
-python3 -c "import json; results_our = [json.loads(line).get('MaxRT') for line in open('AutomaticEval/CaseStudies/results.jsonl')]; results_other = [json.loads(line).get('P_MRT') for line in open('AutomaticEval/CaseStudies/results_other.jsonl')]; print(f'- Partitioned differs in {sum([res1 != res2 for res1, res2 in zip(results_our, results_other)])} cases')"
-
-python3 -c "import json; results_our = [json.loads(line).get('Reac') for line in open('AutomaticEval/CaseStudies/results.jsonl')]; results_other = [json.loads(line).get('BW_Reac') for line in open('AutomaticEval/CaseStudies/results_other.jsonl')]; print(f'- BW differs in {sum([res1 != res2 for res1, res2 in zip(results_our, results_other)])} cases')"
+python3 crosscheck.py --results AutomaticEval/CaseStudies/results.jsonl AutomaticEval/CaseStudies/results_other.jsonl
 
 
 # == Section B: Runtime Comparison ==
@@ -101,11 +97,7 @@ echo "Plots stored in AutomaticEval/RuntimeComparison/WATERS"
 
 # Check that results match
 echo "-> Check that results match"
-python3 -c "import json; results_our = [json.loads(line).get('MaxRT') for line in open('AutomaticEval/RuntimeComparison/WATERS/Our_results05_0.jsonl')] + [json.loads(line).get('MaxRT') for line in open('AutomaticEval/RuntimeComparison/WATERS/Our_results20_0.jsonl')] + [json.loads(line).get('MaxRT') for line in open('AutomaticEval/RuntimeComparison/WATERS/Our_results50_0.jsonl')]; results_other = [json.loads(line).get('FW_MRT') for line in open('AutomaticEval/RuntimeComparison/WATERS/Other_results05_0.jsonl')] + [json.loads(line).get('FW_MRT') for line in open('AutomaticEval/RuntimeComparison/WATERS/Other_results20_0.jsonl')] + [json.loads(line).get('FW_MRT') for line in open('AutomaticEval/RuntimeComparison/WATERS/Other_results50_0.jsonl')]; print(f'- FW differs in {sum([res1 != res2 for res1, res2 in zip(results_our, results_other)])} cases')"
-
-python3 -c "import json; results_our = [json.loads(line).get('MaxRT') for line in open('AutomaticEval/RuntimeComparison/WATERS/Our_results05_0.jsonl')] + [json.loads(line).get('MaxRT') for line in open('AutomaticEval/RuntimeComparison/WATERS/Our_results20_0.jsonl')] + [json.loads(line).get('MaxRT') for line in open('AutomaticEval/RuntimeComparison/WATERS/Our_results50_0.jsonl')]; results_other = [json.loads(line).get('P_MRT') for line in open('AutomaticEval/RuntimeComparison/WATERS/Other_results05_0.jsonl')] + [json.loads(line).get('P_MRT') for line in open('AutomaticEval/RuntimeComparison/WATERS/Other_results20_0.jsonl')] + [json.loads(line).get('P_MRT') for line in open('AutomaticEval/RuntimeComparison/WATERS/Other_results50_0.jsonl')]; print(f'- Partitioned differs in {sum([res1 != res2 for res1, res2 in zip(results_our, results_other)])} cases')"
-
-python3 -c "import json; results_our = [json.loads(line).get('Reac') for line in open('AutomaticEval/RuntimeComparison/WATERS/Our_results05_0.jsonl')] + [json.loads(line).get('Reac') for line in open('AutomaticEval/RuntimeComparison/WATERS/Our_results20_0.jsonl')] + [json.loads(line).get('Reac') for line in open('AutomaticEval/RuntimeComparison/WATERS/Our_results50_0.jsonl')]; results_other = [json.loads(line).get('BW_Reac') for line in open('AutomaticEval/RuntimeComparison/WATERS/Other_results05_0.jsonl')] + [json.loads(line).get('BW_Reac') for line in open('AutomaticEval/RuntimeComparison/WATERS/Other_results20_0.jsonl')] + [json.loads(line).get('BW_Reac') for line in open('AutomaticEval/RuntimeComparison/WATERS/Other_results50_0.jsonl')]; print(f'- BW differs in {sum([res1 != res2 for res1, res2 in zip(results_our, results_other)])} cases')"
+python3 crosscheck.py --results AutomaticEval/RuntimeComparison/WATERS/Our_results05_0.jsonl AutomaticEval/RuntimeComparison/WATERS/Other_results05_0.jsonl --results AutomaticEval/RuntimeComparison/WATERS/Our_results20_0.jsonl AutomaticEval/RuntimeComparison/WATERS/Other_results20_0.jsonl --results AutomaticEval/RuntimeComparison/WATERS/Our_results50_0.jsonl AutomaticEval/RuntimeComparison/WATERS/Other_results50_0.jsonl
 
 
 # = Part 2: UNIFORM Benchmark
@@ -144,11 +136,7 @@ echo "Plots stored in AutomaticEval/RuntimeComparison/UNI"
 
 # Check that results match
 echo "-> Check that results match"
-python3 -c "import json; results_our = [json.loads(line).get('MaxRT') for line in open('AutomaticEval/RuntimeComparison/UNI/Our_results05_0.jsonl')] + [json.loads(line).get('MaxRT') for line in open('AutomaticEval/RuntimeComparison/UNI/Our_results20_0.jsonl')] + [json.loads(line).get('MaxRT') for line in open('AutomaticEval/RuntimeComparison/UNI/Our_results50_0.jsonl')]; results_other = [json.loads(line).get('FW_MRT') for line in open('AutomaticEval/RuntimeComparison/UNI/Other_results05_0.jsonl')] + [json.loads(line).get('FW_MRT') for line in open('AutomaticEval/RuntimeComparison/UNI/Other_results20_0.jsonl')] + [json.loads(line).get('FW_MRT') for line in open('AutomaticEval/RuntimeComparison/UNI/Other_results50_0.jsonl')]; print(f'- FW differs in {sum([res1 != res2 for res1, res2 in zip(results_our, results_other)])} cases')"
-
-python3 -c "import json; results_our = [json.loads(line).get('MaxRT') for line in open('AutomaticEval/RuntimeComparison/UNI/Our_results05_0.jsonl')] + [json.loads(line).get('MaxRT') for line in open('AutomaticEval/RuntimeComparison/UNI/Our_results20_0.jsonl')] + [json.loads(line).get('MaxRT') for line in open('AutomaticEval/RuntimeComparison/UNI/Our_results50_0.jsonl')]; results_other = [json.loads(line).get('P_MRT') for line in open('AutomaticEval/RuntimeComparison/UNI/Other_results05_0.jsonl')] + [json.loads(line).get('P_MRT') for line in open('AutomaticEval/RuntimeComparison/UNI/Other_results20_0.jsonl')] + [json.loads(line).get('P_MRT') for line in open('AutomaticEval/RuntimeComparison/UNI/Other_results50_0.jsonl')]; print(f'- Partitioned differs in {sum([res1 != res2 for res1, res2 in zip(results_our, results_other)])} cases')"
-
-python3 -c "import json; results_our = [json.loads(line).get('Reac') for line in open('AutomaticEval/RuntimeComparison/UNI/Our_results05_0.jsonl')] + [json.loads(line).get('Reac') for line in open('AutomaticEval/RuntimeComparison/UNI/Our_results20_0.jsonl')] + [json.loads(line).get('Reac') for line in open('AutomaticEval/RuntimeComparison/UNI/Our_results50_0.jsonl')]; results_other = [json.loads(line).get('BW_Reac') for line in open('AutomaticEval/RuntimeComparison/UNI/Other_results05_0.jsonl')] + [json.loads(line).get('BW_Reac') for line in open('AutomaticEval/RuntimeComparison/UNI/Other_results20_0.jsonl')] + [json.loads(line).get('BW_Reac') for line in open('AutomaticEval/RuntimeComparison/UNI/Other_results50_0.jsonl')]; print(f'- BW differs in {sum([res1 != res2 for res1, res2 in zip(results_our, results_other)])} cases')"
+python3 crosscheck.py --results AutomaticEval/RuntimeComparison/UNI/Our_results05_0.jsonl AutomaticEval/RuntimeComparison/UNI/Other_results05_0.jsonl --results AutomaticEval/RuntimeComparison/UNI/Our_results20_0.jsonl AutomaticEval/RuntimeComparison/UNI/Other_results20_0.jsonl --results AutomaticEval/RuntimeComparison/UNI/Our_results50_0.jsonl AutomaticEval/RuntimeComparison/UNI/Other_results50_0.jsonl
 
 
 
@@ -0,0 +1,271 @@
+"""Scaling benchmark for the stages of analyze() with regression check against a stored baseline.
+
+The benchmark sweeps
+- the chain length (number of tasks, fixed hyperperiod),
+- H/Tp (hyperperiod / maximal period, fixed number of tasks),
+- the number of anchor points (chains with uniform periods as in generate.py, selected by their number of anchor points),
+- the relative bound (for the metrics that require a bound),
+and times each stage of the analysis separately. The chains are constructed deterministically: the maximal period is
+Tp = 17 * 19 = 323 and the other periods are products of the primes 2, 3, 5, 7, 11, 13, so that H/Tp is exactly the
+product of the used primes.
+
+All times are normalized by the time of a fixed pure-Python calibration workload, so that baselines recorded on
+different machines are comparable. Empirical scaling exponents are fitted in log-log scale (time ~ parameter^exponent).
+"""
+
+import argparse
+import json
+import math
+import random
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from analysis import CEChain, Task, METRICS, BOUND_METRICS, ensure_filepath_exists
+
+BASE_PERIOD = 17 * 19  # maximal period Tp
+PRIMES = [2, 3, 5, 7, 11, 13]
+
+SWEEPS = {
+    # name: (parameter, values, values for --quick)
+    'length': ('tasks', [4, 8, 16, 32, 64], [4, 8, 16]),
+    'HTp': ('H/Tp', [2, 6, 30, 210, 2310, 30030], [2, 6, 30, 210]),
+    'anchors': ('#AnchorsRT', [10, 100, 1000, 10000], [10, 100]),
+    'bound': ('relative_bound', [0.5, 0.7, 0.9, 1.0], [0.5, 0.9]),
+}
+LENGTH_HTP = 30  # H/Tp for the length sweep
+HTP_TASKS = 8  # number of tasks for the H/Tp sweep
+BOUND_HTP = 2310  # H/Tp for the bound sweep (quick: 210)
+
+STAGES = ['compress', 'warmup', 'anchors', 'anchors_compressed'] + list(METRICS.keys())
+
+
+##########
+# Chains
+##########
+
+def _divisors(number):
+    return [d for d in range(1, number + 1) if number % d == 0]
+
+def gen_bench_chain(number_tasks, htp, rng, id=None):
+    """Chain with number_tasks tasks, maximal period BASE_PERIOD and hyperperiod htp * BASE_PERIOD (htp a product of PRIMES).
+    Random phase and implicit deadlines (as in generate.py)."""
+    factors = [q for q in PRIMES if htp % q == 0]
+    assert math.prod(factors) == htp, f"{htp} is not a product of distinct primes from {PRIMES}."
+    periods = [BASE_PERIOD] + factors
+    assert len(periods) <= number_tasks, f"{number_tasks} tasks are too few for H/Tp={htp}."
+    # Remaining tasks with periods that keep the hyperperiod
+    candidates = [d for d in _divisors(htp * BASE_PERIOD) if 1 < d <= BASE_PERIOD]
+    periods += [rng.choice(candidates) for _ in range(number_tasks - len(periods))]
+    rng.shuffle(periods)
+    return CEChain(*[Task(rng.randint(0, per), per, per) for per in periods], id=id)
+
+def gen_anchor_chain(target, rng, number_tasks=5, id=None):
+    """Chain with uniform periods (10, 20, ..., 200) with between target/2 and 2*target anchor points."""
+    periods_list = list(range(10, 201, 10))
+    while True:
+        periods = rng.choices(periods_list, k=number_tasks)
+        if not target / 2 <= math.lcm(*periods) / max(periods) <= 4 * target:
+            continue
+        chain = CEChain(*[Task(rng.randint(0, per), per, per) for per in periods], id=id)
+        chain.calc_anchors()
+        if target / 2 <= len(chain.anchorsRT) - 1 <= 2 * target:
+            chain.warmup = chain.starttimes = chain.anchorsRT = None
+            return chain
+
+
+##########
+# Timing
+##########
+
+def calibrate(repeat=5):
+    """Time of a fixed pure-Python workload (minimum over repetitions)."""
+    def workload():
+        acc = 0
+        for i in range(200000):
+            acc += math.floor((i * 7 + 3) / 5) % 11
+        return acc
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        workload()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def _timed(func, repeat):
+    """Minimum runtime of func over repetitions and the last return value."""
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = func()
+        best = min(best, time.perf_counter() - start)
+    return best, value
+
+def time_stages(chain: CEChain, relative_bound=0.9, repeat=3):
+    """Runtime of each stage of the analysis of the chain, and the number of anchor points."""
+    times = dict()
+    chain.calc_hyperperiod()
+    times['compress'], _ = _timed(chain.compress, repeat)
+    times['warmup'], _ = _timed(chain.calc_warmup, repeat)
+
+    def anchors(compress):
+        chain.anchorsRT = None
+        chain.calc_anchors(compress=compress)
+    times['anchors'], _ = _timed(lambda: anchors(False), repeat)
+    times['anchors_compressed'], _ = _timed(lambda: anchors(True), repeat)
+
+    values = dict()
+    for m, (_, func) in METRICS.items():
+        bound = relative_bound * values['MaxRT'] if m in BOUND_METRICS else None
+        times[m], values[m] = _timed(lambda: func(chain, values, bound), repeat)
+    return times, len(chain.anchorsRT) - 1
+
+
+def run_sweep(name, quick=False, chains_per_point=5, repeat=3, seed=0, calibration=1.0):
+    """Median normalized stage times for each value of the swept parameter."""
+    param, values, quick_values = SWEEPS[name]
+    rng = random.Random(seed)
+    points = []
+    for value in (quick_values if quick else values):
+        stage_times = {stage: [] for stage in STAGES}
+        anchors = []
+        for idx in range(chains_per_point):
+            if name == 'length':
+                chain = gen_bench_chain(value, LENGTH_HTP, rng, id=idx)
+                times, n_anchors = time_stages(chain, repeat=repeat)
+            elif name == 'HTp':
+                chain = gen_bench_chain(HTP_TASKS, value, rng, id=idx)
+                times, n_anchors = time_stages(chain, repeat=repeat)
+            elif name == 'anchors':
+                chain = gen_anchor_chain(value, rng, id=idx)
+                times, n_anchors = time_stages(chain, repeat=repeat)
+            else:
+                chain = gen_bench_chain(HTP_TASKS, 210 if quick else BOUND_HTP, rng, id=idx)
+                times, n_anchors = time_stages(chain, relative_bound=value, repeat=repeat)
+            for stage in STAGES:
+                stage_times[stage].append(times[stage] / calibration)
+            anchors.append(n_anchors)
+        points.append({
+            'value': value,
+            '#AnchorsRT': statistics.median(anchors),
+            'stages': {stage: statistics.median(ts) for stage, ts in stage_times.items()},
+        })
+    return {'param': param, 'points': points}
+
+
+def fit_exponents(xs, points):
+    """Slope of log(time) over log(x) for each stage (None if not enough distinct values)."""
+    exponents = dict()
+    for stage in STAGES:
+        pairs = [(x, p['stages'][stage]) for x, p in zip(xs, points) if x > 0 and p['stages'][stage] > 0]
+        if len({x for x, _ in pairs}) < 2:
+            exponents[stage] = None
+            continue
+        slope, _ = np.polyfit(np.log([x for x, _ in pairs]), np.log([t for _, t in pairs]), 1)
+        exponents[stage] = float(slope)
+    return exponents
+
+
+def benchmark_config(quick=False, chains_per_point=5, repeat=3, seed=0):
+    """Configuration of a run; results are only comparable with a baseline of the same configuration."""
+    return {'quick': quick, 'chains_per_point': chains_per_point, 'repeat': repeat, 'seed': seed}
+
+
+def run_benchmark(quick=False, chains_per_point=5, repeat=3, seed=0):
+    calibration = calibrate()
+    results = {
+        'config': benchmark_config(quick, chains_per_point, repeat, seed),
+        'calibration_sec': calibration,
+        'sweeps': dict(),
+        'exponents': dict(),
+    }
+    for name in SWEEPS:
+        results['sweeps'][name] = run_sweep(name, quick=quick, chains_per_point=chains_per_point, repeat=repeat,
+                                            seed=seed, calibration=calibration)
+
+    for name in ['length', 'HTp']:
+        points = results['sweeps'][name]['points']
+        results['exponents'][name] = fit_exponents([p['value'] for p in points], points)
+    # Over the observed number of anchor points
+    points = results['sweeps']['anchors']['points']
+    results['exponents']['anchors'] = fit_exponents([p['#AnchorsRT'] for p in points], points)
+
+    # Total normalized time per stage over all sweeps
+    results['totals'] = {stage: sum(p['stages'][stage] for sweep in results['sweeps'].values() for p in sweep['points'])
+                         for stage in STAGES}
+    return results
+
+
+def check_regression(results, baseline, tolerance=0.5, min_time=1e-3):
+    """Stages whose total normalized time exceeds the baseline by more than the tolerance (relative).
+    Stages with a baseline below min_time (normalized) are too short to be measured reliably and are skipped.
+    The configurations of results and baseline must be the same (see benchmark_config())."""
+    regressions = []
+    for stage, base in baseline['totals'].items():
+        if stage not in results['totals'] or base < min_time:
+            continue
+        current = results['totals'][stage]
+        if current > base * (1 + tolerance):
+            regressions.append({'stage': stage, 'baseline': base, 'current': current, 'ratio': current / base})
+    return regressions
+
+
+##########
+# Main
+##########
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling benchmark for the stages of the analysis with regression check against a baseline.")
+    parser.add_argument("-o", "--output", help="Output file to save the benchmark results (.json, optional)")
+    parser.add_argument("--save-baseline", nargs="?", const="benchmarks/baseline.json", help="Store the results as baseline (default: benchmarks/baseline.json)")
+    parser.add_argument("--check", nargs="?", const="benchmarks/baseline.json", help="Compare against the baseline (default: benchmarks/baseline.json) and fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed relative slowdown of a stage against the baseline (default: 0.5)")
+    parser.add_argument("--quick", action="store_true", help="Smaller sweeps")
+    parser.add_argument("--chains", type=int, default=5, help="Number of chains per sweep point (default: 5)")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of repetitions per stage, the minimum is taken (default: 3)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the chains (default: 0)")
+
+    args = parser.parse_args()
+
+    baseline = None
+    if args.check:
+        try:
+            with open(args.check, "r") as f:
+                baseline = json.load(f)
+        except OSError as e:
+            print(f"Error: Cannot read the baseline {args.check}: {e.strerror}")
+            sys.exit(1)
+        config = benchmark_config(args.quick, args.chains, args.repeat, args.seed)
+        if baseline.get('config') != config:
+            print(f"Error: The benchmark configuration {json.dumps(config)} differs from the configuration of the baseline {args.check} ({json.dumps(baseline.get('config'))}).")
+            sys.exit(1)
+
+    results = run_benchmark(quick=args.quick, chains_per_point=args.chains, repeat=args.repeat, seed=args.seed)
+
+    for name, exponents in results['exponents'].items():
+        print(f"Exponents over {name}: " + ", ".join(f"{stage}={e:.2f}" for stage, e in exponents.items() if e is not None))
+
+    if args.output:
+        ensure_filepath_exists(args.output)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+    if args.save_baseline:
+        ensure_filepath_exists(args.save_baseline)
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=4)
+        print(f"Baseline stored in: {args.save_baseline}")
+
+    if args.check:
+        regressions = check_regression(results, baseline, tolerance=args.tolerance)
+        for reg in regressions:
+            print(f"Regression in {reg['stage']}: {reg['ratio']:.2f}x baseline ({reg['current']:.4f} vs {reg['baseline']:.4f} normalized)")
+        if regressions:
+            return 1
+        print(f"No regressions (tolerance {args.tolerance:.0%}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
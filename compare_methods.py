@@ -5,7 +5,8 @@ import itertools
 import json
 import signal
 import time
-from analysis import Task as OurTask, ensure_filepath_exists
+import sys
+from analysis import Task as OurTask, ResultWriter
 from analysis import CEChain as OurCEChain
 from analysis import load_chains_from_jsonl
 
@@ -481,16 +482,16 @@ def sun23(chain: CEChain) -> float:
     """Computs the reactive time."""
     """https://ieeexplore.ieee.org/document/10155700"""
     """Algorithm 3"""
-    hyperperiod = ch.hyperperiod()
+    hyperperiod = chain.hyperperiod()
     theta = dict()
 
     for idx in itertools.count():
-        rel_last_job = ch[-1].phase + idx * ch[-1].period
+        rel_last_job = chain[-1].phase + idx * chain[-1].period
 
         # = Track data backwards
         z = rel_last_job  # initialize time point
         no_job = 0  # initialize job number
-        for tsk in ch[-2::-1]:
+        for tsk in chain[-2::-1]:
             no_job = let_we_leq(z,tsk)
             if no_job < 0:
                 break
@@ -500,22 +501,170 @@ def sun23(chain: CEChain) -> float:
         if no_job < 0:
             continue
         
-        if z <= ch[-1].phase + hyperperiod:
+        if z <= chain[-1].phase + hyperperiod:
             if not z in theta:
                 theta[z] = []
             # store write-event of that pc-chain
-            theta[z].append(rel_last_job + ch[-1].deadline) 
+            theta[z].append(rel_last_job + chain[-1].deadline) 
         else:
             break
 
     # compute reactive time from theta
     rct_list = []
     for key in theta:
-        rct_list.append(min(theta[key])-key + ch[0].period)
+        rct_list.append(min(theta[key])-key + chain[0].period)
     
     return max(rct_list)
 
 
+# === Index-based implementations ===
+# Same algorithms as above, but operating on integer job indices over plain
+# arrays of task parameters (as CEChain._immfw/_immbw in analysis.py), i.e.,
+# without constructing Task, Job or CEChain objects during the analysis.
+
+def _chain_arrays(chain: OurCEChain):
+    """Phases, periods and deadlines of the tasks of a chain as plain lists."""
+    return ([tsk.phase for tsk in chain.tasks],
+            [tsk.period for tsk in chain.tasks],
+            [tsk.deadline for tsk in chain.tasks])
+
+def LET_per_idx(chain: OurCEChain) -> float:
+    """Index-based version of LET_per()."""
+    phases, periods, deadlines = _chain_arrays(chain)
+    n = len(periods)
+    hyper = math.lcm(*periods)
+    max_phase = max(phases)
+    WCRT_max = max(deadlines)
+
+    # First m with release(m+1) + deadline >= max_phase (skipped iterations of LET_per)
+    mvar = max(1, -((phases[0] + deadlines[0] - max_phase) // periods[0]))
+    zvar = phases[0] + (mvar - 1) * periods[0]
+    end = max_phase + hyper + WCRT_max
+
+    length = None
+    while zvar <= end:
+        relvar = zvar + periods[0]
+        for i in range(n - 1):
+            # Principle 2 (release of next job at or after the write-event)
+            compare_value = relvar + deadlines[i]
+            relvar = phases[i+1] - ((phases[i+1] - compare_value) // periods[i+1]) * periods[i+1]
+        # Principle 3
+        this_length = relvar + deadlines[-1] - zvar
+        if length is None or this_length > length:
+            length = this_length
+        zvar += periods[0]
+
+    return length
+
+def guenzel23_equi_mda_idx(chain: OurCEChain) -> float:
+    """Index-based version of guenzel23_equi_mda()."""
+    phases, periods, deadlines = _chain_arrays(chain)
+    n = len(periods)
+
+    # Construct F_i (one forward and one backward job chain)
+    jobidx = 0
+    for i in range(n - 1):
+        jobidx = max(-((phases[i+1] - phases[i] - jobidx * periods[i] - deadlines[i]) // periods[i+1]), 0)
+    Fi = [jobidx]
+    for i in range(n - 1, 0, -1):
+        jobidx = (phases[i] + jobidx * periods[i] - phases[i-1] - deadlines[i-1]) // periods[i-1]
+        Fi.insert(0, jobidx)
+
+    # find analysis interval
+    analysis_end = 2 * math.lcm(*periods) + max(phases)
+
+    # choose point for partitioning
+    part = periods.index(max(periods))
+
+    result = None
+    occurrence = Fi[part]
+    while True:
+        # backward part (first job of the partitioned job chain)
+        jobidx = occurrence
+        for i in range(part, 0, -1):
+            jobidx = (phases[i] + jobidx * periods[i] - phases[i-1] - deadlines[i-1]) // periods[i-1]
+        start = phases[0] + jobidx * periods[0]
+        if start > analysis_end:
+            break
+        assert jobidx >= 0
+
+        # forward part (last job of the partitioned job chain)
+        jobidx = occurrence + 1
+        for i in range(part, n - 1):
+            jobidx = max(-((phases[i+1] - phases[i] - jobidx * periods[i] - deadlines[i]) // periods[i+1]), 0)
+        end = phases[-1] + jobidx * periods[-1] + deadlines[-1]
+
+        if result is None or end - start > result:
+            result = end - start
+        occurrence += 1
+
+    return result
+
+def guenzel23_equi_mrt_idx(chain: OurCEChain) -> float:
+    return guenzel23_equi_mda_idx(chain)
+
+def sun23_idx(chain: OurCEChain) -> float:
+    """Index-based version of sun23()."""
+    phases, periods, deadlines = _chain_arrays(chain)
+    n = len(periods)
+    hyperperiod = math.lcm(*periods)
+    theta = dict()  # only the minimal write-event per key is needed
+
+    for idx in itertools.count():
+        rel_last_job = phases[-1] + idx * periods[-1]
+
+        # = Track data backwards
+        z = rel_last_job
+        no_job = 0
+        for i in range(n - 2, -1, -1):
+            no_job = (z - phases[i] - deadlines[i]) // periods[i]
+            if no_job < 0:
+                break
+            z = phases[i] + periods[i] * no_job
+
+        # incomplete backward job chain
+        if no_job < 0:
+            continue
+
+        if z <= phases[-1] + hyperperiod:
+            if z not in theta:
+                theta[z] = rel_last_job + deadlines[-1]
+        else:
+            break
+
+    return max(theta[key] - key + periods[0] for key in theta)
+
+
+# Implementations that can be selected in the main function
+IMPLEMENTATIONS = {
+    'reference': (LET_per, guenzel23_equi_mrt, sun23),
+    'index': (LET_per_idx, guenzel23_equi_mrt_idx, sun23_idx),
+}
+
+
+def translate_chain(chain: OurCEChain) -> CEChain:
+    """Translate a chain from analysis.py to the object type from the sota."""
+    new_task_list = []
+    for tsk in chain.tasks:
+        new_task_list.append(Task(
+            'periodic',
+            'arbitrary',
+            'wcet',
+            'LET',
+            phase=tsk.phase,
+            min_iat=tsk.period,
+            max_iat=tsk.period,
+            period=tsk.period,
+            bcet=None,
+            wcet=None,
+            deadline=tsk.deadline,
+            priority=None
+            ))
+    translated = CEChain(*new_task_list)
+    translated.id = chain.id
+    return translated
+
+
 
 # Main
 
@@ -526,96 +675,85 @@ if __name__ == "__main__":
     parser.add_argument("output", help="Output file to save results (.jsonl)")
     parser.add_argument("-t", "--timeout", type=int, help="Set a timeout in seconds.")
     parser.add_argument("--no-print", action="store_true", help="Do not print results to stdout")
+    parser.add_argument("--resume", action="store_true", help="Keep the results already stored in the output file and only analyze chains with other IDs")
+    parser.add_argument("--impl", choices=list(IMPLEMENTATIONS.keys()), default="reference", help="Implementation of the methods: object-based 'reference' or allocation-free 'index' (default: reference)")
+    selection = parser.add_mutually_exclusive_group()
+    selection.add_argument("--ids", nargs="+", metavar="ID", help="Only analyze the chains with these IDs (read directly using the ID index <input>.idx)")
+    selection.add_argument("--id-range", nargs=2, metavar=("FIRST", "LAST"), help="Only analyze the chains from ID FIRST to ID LAST in file order (read directly using the ID index <input>.idx)")
     args = parser.parse_args()
 
     # Load
-    chains = load_chains_from_jsonl(args.input)
-
-    # Check output folder
-    ensure_filepath_exists(args.output)
-
-    # Translate chains to the object type from the sota
-    translated_chains = []
-    for ch in chains:
-        new_task_list = []
-        for tsk in ch.tasks:
-            new_task_list.append(Task(
-                'periodic', 
-                'arbitrary', 
-                'wcet',
-                'LET', 
-                phase=tsk.phase, 
-                min_iat=tsk.period,
-                max_iat=tsk.period,
-                period=tsk.period,
-                bcet=None,
-                wcet=None,
-                deadline=tsk.deadline, 
-                priority=None
-                ))
-        translated_chains.append(CEChain(*new_task_list))
-        translated_chains[-1].id = ch.id
-    
+    try:
+        chains = load_chains_from_jsonl(args.input, ids=args.ids, id_range=args.id_range)
+    except KeyError as e:
+        print(f"Error: {e.args[0]}")
+        sys.exit(1)
+
+    # Output (results are appended and synced periodically)
+    writer = ResultWriter(args.output, resume=args.resume, total=len(chains))
+    if args.resume:
+        chains = [ch for ch in chains if ch.id not in writer.done]
+
+    # Translate chains to the object type from the sota (only needed for the reference implementations)
+    if args.impl == 'reference':
+        translated_chains = [translate_chain(ch) for ch in chains]
+    else:
+        translated_chains = chains
+    fw_method, p_method, bw_method = IMPLEMENTATIONS[args.impl]
 
     # Rund experiments
-    results = []
-    for ch in translated_chains:
-        this_chain_results = dict()
-        this_chain_results["ID"] = ch.id
-
-        # Based on forward job chains
-        try:
-            if args.timeout:
-                signal.signal(signal.SIGALRM, _timeout_handler)
-                signal.alarm(args.timeout)
-            start_time = time.time()
-            res = LET_per(ch)
-            end_time = time.time()
-            this_chain_results['FW_MRT'] = res
-            this_chain_results['FW_TIME'] = end_time - start_time
-            signal.alarm(0)
-        except TimeoutError as e:
-            this_chain_results['FW_TIME'] = args.timeout
-            signal.alarm(0)
-
-        # Based on partitioned job chains
-        try:
-            if args.timeout:
-                signal.signal(signal.SIGALRM, _timeout_handler)
-                signal.alarm(args.timeout)
-            start_time = time.time()
-            res = guenzel23_equi_mrt(ch)
-            end_time = time.time()
-            this_chain_results['P_MRT'] = res
-            this_chain_results['P_TIME'] = end_time - start_time
-            signal.alarm(0)
-        except TimeoutError as e:
-            print(start_time, time.time())
-            this_chain_results['P_TIME'] = args.timeout
-            signal.alarm(0)
-
-        # reactive time (based on backward job chains)
-        try:
-            if args.timeout:
-                signal.signal(signal.SIGALRM, _timeout_handler)
-                signal.alarm(args.timeout)
-            start_time = time.time()
-            res = sun23(ch)
-            end_time = time.time()
-            this_chain_results['BW_Reac'] = res
-            this_chain_results['BW_TIME'] = end_time - start_time
-            signal.alarm(0)
-        except TimeoutError as e:
-            this_chain_results['BW_TIME'] = args.timeout
-            signal.alarm(0)
-
-        results.append(this_chain_results)
-
-        if not args.no_print:
-            print(json.dumps(this_chain_results))
-
-    # Store
-    with open(args.output, "w") as f:
-        for r in results:
-            f.write(json.dumps(r) + "\n")
-
+    with writer:
+        for ch in translated_chains:
+            this_chain_results = dict()
+            this_chain_results["ID"] = ch.id
+
+            # Based on forward job chains
+            try:
+                if args.timeout:
+                    signal.signal(signal.SIGALRM, _timeout_handler)
+                    signal.alarm(args.timeout)
+                start_time = time.time()
+                res = fw_method(ch)
+                end_time = time.time()
+                this_chain_results['FW_MRT'] = res
+                this_chain_results['FW_TIME'] = end_time - start_time
+                signal.alarm(0)
+            except TimeoutError as e:
+                this_chain_results['FW_TIME'] = args.timeout
+                signal.alarm(0)
+
+            # Based on partitioned job chains
+            try:
+                if args.timeout:
+                    signal.signal(signal.SIGALRM, _timeout_handler)
+                    signal.alarm(args.timeout)
+                start_time = time.time()
+                res = p_method(ch)
+                end_time = time.time()
+                this_chain_results['P_MRT'] = res
+                this_chain_results['P_TIME'] = end_time - start_time
+                signal.alarm(0)
+            except TimeoutError as e:
+                print(start_time, time.time())
+                this_chain_results['P_TIME'] = args.timeout
+                signal.alarm(0)
+
+            # reactive time (based on backward job chains)
+            try:
+                if args.timeout:
+                    signal.signal(signal.SIGALRM, _timeout_handler)
+                    signal.alarm(args.timeout)
+                start_time = time.time()
+                res = bw_method(ch)
+                end_time = time.time()
+                this_chain_results['BW_Reac'] = res
+                this_chain_results['BW_TIME'] = end_time - start_time
+                signal.alarm(0)
+            except TimeoutError as e:
+                this_chain_results['BW_TIME'] = args.timeout
+                signal.alarm(0)
+
+            writer.write(this_chain_results)
+
+            if not args.no_print:
+                print(json.dumps(this_chain_results))
@@ -0,0 +1,184 @@
+"""Differential cross-check of our analysis against the methods used for comparison."""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import random
+import sys
+
+from analysis import CEChain, analyze, load_chains_from_jsonl, ensure_filepath_exists, open_file
+from compare_methods import IMPLEMENTATIONS, translate_chain
+from generate import gen_chain
+
+# Pairs (key of our analysis, key of the method for comparison) that have to match
+CHECKS = [('MaxRT', 'FW_MRT'), ('MaxRT', 'P_MRT'), ('Reac', 'BW_Reac')]
+
+
+def crosscheck(chain: CEChain, impl='reference'):
+    """Run our analysis and the methods for comparison on the same chain.
+    Returns the results of all methods and a list of the keys that differ from our analysis."""
+    res = dict()
+    res["ID"] = chain.id
+    res["tasks"] = [{"phase": t.phase, "period": t.period, "deadline": t.deadline} for t in chain.tasks]
+
+    ours = analyze(chain)
+    res['MaxRT'] = ours['MaxRT']
+    res['Reac'] = ours['Reac']
+
+    fw_method, p_method, bw_method = IMPLEMENTATIONS[impl]
+    ch = translate_chain(chain) if impl == 'reference' else chain
+    res['FW_MRT'] = fw_method(ch)
+    res['P_MRT'] = p_method(ch)
+    res['BW_Reac'] = bw_method(ch)
+
+    res['differs'] = [other for our, other in CHECKS if res[our] != res[other]]
+    return res
+
+
+def _crosscheck_worker(args):
+    chain, impl = args
+    return crosscheck(chain, impl)
+
+
+def run_crosscheck(chains, impl='reference', jobs=None):
+    """Cross-check all chains in parallel. Yields the results in input order."""
+    if jobs == 1:
+        for chain in chains:
+            yield crosscheck(chain, impl)
+        return
+    with multiprocessing.Pool(jobs) as pool:
+        yield from pool.imap(_crosscheck_worker, ((chain, impl) for chain in chains), chunksize=8)
+
+
+def fuzz(bench, number_tasks, impl='reference', jobs=None, batch=100, max_chains=None, maxHTp=None, maxH=None):
+    """Cross-check randomly generated chains until the first discrepancy is found.
+    Returns the result of the first discrepancy and the number of checked chains (result is None if no discrepancy is found within max_chains)."""
+    checked = 0
+    with multiprocessing.Pool(jobs) as pool:
+        for startid in itertools.count(step=batch):
+            number = batch if max_chains is None else min(batch, max_chains - checked)
+            if number <= 0:
+                break
+            chains = [gen_chain(bench, number_tasks, startid + idx, maxHTp=maxHTp, maxH=maxH) for idx in range(number)]
+            for res in pool.imap(_crosscheck_worker, ((chain, impl) for chain in chains), chunksize=8):
+                checked += 1
+                if res['differs']:
+                    return res, checked
+    return None, checked
+
+
+def compare_result_files(our_file, other_file):
+    """Compare stored results of our analysis (analysis.py) with stored results of the methods for comparison
+    (compare_methods.py), matched by chain ID. Values that are missing on either side (e.g., timeouts) are not compared.
+    Returns the mismatching pairs of results and, per check, the number of compared and of missing values."""
+    with open_file(other_file, "r") as f:
+        other = {res["ID"]: res for res in map(json.loads, f)}
+    mismatches = []
+    compared = {check: 0 for check in CHECKS}
+    missing = {check: 0 for check in CHECKS}
+    with open_file(our_file, "r") as f:
+        for ours in map(json.loads, f):
+            theirs = other.get(ours["ID"], {})
+            differs = []
+            for our, oth in CHECKS:
+                if ours.get(our) is None or theirs.get(oth) is None:
+                    missing[(our, oth)] += 1
+                    continue
+                compared[(our, oth)] += 1
+                if ours[our] != theirs[oth]:
+                    differs.append(oth)
+            if differs:
+                mismatches.append({"ID": ours["ID"], **{our: ours.get(our) for our, _ in CHECKS},
+                                   **{oth: theirs.get(oth) for _, oth in CHECKS}, "differs": differs})
+    return mismatches, compared, missing
+
+
+def results_main(pairs):
+    """Compare pairs of result files (see compare_result_files()) and print the mismatches and a summary."""
+    mismatches = []
+    compared = {check: 0 for check in CHECKS}
+    missing = {check: 0 for check in CHECKS}
+    for our_file, other_file in pairs:
+        mis, comp, miss = compare_result_files(our_file, other_file)
+        mismatches.extend(mis)
+        for check in CHECKS:
+            compared[check] += comp[check]
+            missing[check] += miss[check]
+    for res in mismatches:
+        print(json.dumps(res))
+    for our, other in CHECKS:
+        print(f"- {our} vs. {other} differs in {sum(other in res['differs'] for res in mismatches)} of {compared[(our, other)]} cases ({missing[(our, other)]} not compared, e.g., timeouts)")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-check our analysis with the methods used for comparison (MaxRT with FW_MRT and P_MRT, Reac with BW_Reac).")
+    parser.add_argument("input", nargs='*', help="Input files (.jsonl)")
+    parser.add_argument("-o", "--output", help="Output file to save the mismatching chains (optional)")
+    parser.add_argument("-j", "--jobs", type=int, help="Number of parallel processes (default: number of CPUs)")
+    parser.add_argument("--impl", choices=list(IMPLEMENTATIONS.keys()), default="reference", help="Implementation of the methods for comparison: object-based 'reference' (LET_per, guenzel23_equi_mrt, sun23) or allocation-free 'index' (default: reference)")
+    parser.add_argument("--results", nargs=2, action="append", metavar=("OUR", "OTHER"), help="Compare stored results of analysis.py (OUR) and compare_methods.py (OTHER) instead of running the methods (can be repeated)")
+    parser.add_argument("--fuzz", action="store_true", help="Cross-check randomly generated chains until the first discrepancy is found.")
+    parser.add_argument("--bench", choices=["WATERS", "UNI"], default="WATERS", help="Fuzzing: benchmark type (default: WATERS)")
+    parser.add_argument("--tasks", type=int, default=5, help="Fuzzing: number of tasks per chain (default: 5)")
+    parser.add_argument("--sets", type=int, default=None, help="Fuzzing: maximal number of chains to check (default: unlimited)")
+    parser.add_argument("--maxH", type=int, default=None, help="Fuzzing: maximal allowed value of Hyperperiod. (For generator UNIFORM only.)")
+    parser.add_argument("--maxHTp", type=int, default=None, help="Fuzzing: maximal allowed value of Hyperperiod / maximal period. (For generator UNIFORM only.)")
+    parser.add_argument("--seed", type=int, help="Fuzzing: random seed")
+
+    args = parser.parse_args()
+
+    if args.results:
+        mismatches = results_main(args.results)
+        if args.output:
+            ensure_filepath_exists(args.output)
+            with open(args.output, "w") as f:
+                for r in mismatches:
+                    f.write(json.dumps(r) + "\n")
+        return 1 if mismatches else 0
+
+    if args.fuzz:
+        if args.seed is not None:
+            import numpy
+            random.seed(args.seed)
+            numpy.random.seed(args.seed)
+        res, checked = fuzz(args.bench, args.tasks, impl=args.impl, jobs=args.jobs, max_chains=args.sets, maxHTp=args.maxHTp, maxH=args.maxH)
+        if res is None:
+            print(f"- No discrepancy in {checked} chains")
+            return 0
+        print(f"- Discrepancy found after {checked} chains:")
+        print(json.dumps(res))
+        if args.output:
+            ensure_filepath_exists(args.output)
+            with open(args.output, "w") as f:
+                f.write(json.dumps(res) + "\n")
+        return 1
+
+    if not args.input:
+        parser.error("no input file specified (use --fuzz to check random chains or --results to compare result files)")
+
+    chains = []
+    for filename in args.input:
+        chains.extend(load_chains_from_jsonl(filename))
+
+    mismatches = []
+    for res in run_crosscheck(chains, impl=args.impl, jobs=args.jobs):
+        if res['differs']:
+            mismatches.append(res)
+            print(json.dumps(res))
+
+    for our, other in CHECKS:
+        print(f"- {our} vs. {other} differs in {sum(other in res['differs'] for res in mismatches)} of {len(chains)} cases")
+
+    if args.output:
+        ensure_filepath_exists(args.output)
+        with open(args.output, "w") as f:
+            for r in mismatches:
+                f.write(json.dumps(r) + "\n")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,14 +17,19 @@ def gen_periods_WATERS(number: int):
     return list(map(int, task_set_periods))
 
 
+def gen_chain_WATERS(number_tasks, id):
+    """Generate one cause-effect chain using the WATERS periods, with random phase and implicit deadlines."""
+    periods = gen_periods_WATERS(number_tasks)
+    return CEChain(*[Task(random.randint(0,per), per, per) for per in periods], id=id)
+
+
 def generateSynchronousImplicitWATERS(number_tasks, number_chains, filename, startid=0):
     """Generate cause-effect chains using the WATERS periods, with random phase and implicit deadlines."""
     
     # Generate CE chains
     chains = []
     for idx in range(number_chains):
-        periods = gen_periods_WATERS(number_tasks)
-        chains.append(CEChain(*[Task(random.randint(0,per), per, per) for per in periods], id=startid+idx))
+        chains.append(gen_chain_WATERS(number_tasks, startid+idx))
     
     # Store CE chains
     save_chains_as_jsonl(chains, filename)
@@ -34,20 +39,36 @@ def gen_periods_uniform(number: int, periods: list):
     """Draw periods uniformly from a given set of periods."""
     return random.choices(periods, k=number)
 
+def gen_chain_uniform(number_tasks, id, maxHTp=None, maxH=None):
+    """Generate one cause-effect chain with uniform periods, random phase and implicit deadlines.
+    Current period range: 10, 20, 30, ..., 200
+    """
+    periods_list = list(range(10, 201, 10))
+    while True:
+        periods = gen_periods_uniform(number_tasks, periods_list)
+        if maxH is None or math.lcm(*periods) <= maxH:
+            if maxHTp is None or math.lcm(*periods)/max(*periods) <= maxHTp:
+                break
+    return CEChain(*[Task(random.randint(0,per), per, per) for per in periods], id=id)
+
+
 def generateUniform(number_tasks, number_chains, filename, startid=0, maxHTp=None, maxH=None):
     """Generate cause-effect chains with uniform periods, random phase and implicit deadlines.
     Current period range: 10, 20, 30, ..., 200
     """
     chains = []
-    periods_list = list(range(10, 201, 10))
     for idx in range(number_chains):
-        while True:
-            periods = gen_periods_uniform(number_tasks, periods_list)
-            if maxH is None or math.lcm(*periods) <= maxH:
-                if maxHTp is None or math.lcm(*periods)/max(*periods) <= maxHTp:
-                    break
-        chains.append(CEChain(*[Task(random.randint(0,per), per, per) for per in periods], id=startid+idx))
+        chains.append(gen_chain_uniform(number_tasks, startid+idx, maxHTp=maxHTp, maxH=maxH))
     save_chains_as_jsonl(chains, filename)
+
+
+def gen_chain(bench, number_tasks, id, maxHTp=None, maxH=None):
+    """Generate one cause-effect chain of the given benchmark ('WATERS' or 'UNI')."""
+    if bench == "WATERS":
+        return gen_chain_WATERS(number_tasks, id)
+    elif bench == "UNI":
+        return gen_chain_uniform(number_tasks, id, maxHTp=maxHTp, maxH=maxH)
+    raise ValueError(f'{bench} is not a possible benchmark.')
     
 
 if __name__ == "__main__":
@@ -0,0 +1,220 @@
+"""Cause-effect graphs: analysis of all source-to-sink paths of a DAG of LET tasks.
+
+Paths of a cause-effect graph often share segments (e.g., LG->LOC->EKF->Planner->DASM and CAN->LOC->EKF->Planner->DASM).
+Each path is analyzed as a CEChain, but the partitioned job chains are only needed through their first and last job.
+These are computed with a trie over the path prefixes (backward job chains) and a trie over the reversed paths
+(forward job chains), memoizing the reached job index per trie node and job. Paths with a common prefix or suffix
+therefore share the computation of their common segments.
+"""
+
+import argparse
+import json
+import sys
+
+from analysis import CEChain, Task, analyze, ensure_filepath_exists, open_file, save_chains_as_jsonl
+
+
+class CEGraph:
+    """A cause-effect graph, i.e., a DAG of LET tasks with data edges."""
+    def __init__(self, tasks: dict, edges: list, id=None):
+        self.tasks = tasks  # name -> Task
+        self.edges = [tuple(e) for e in edges]
+        self.id = id
+        for src, dst in self.edges:
+            assert src in self.tasks and dst in self.tasks, f"Edge {src}->{dst} refers to an unknown task."
+
+        self.successors = {name: [] for name in self.tasks}
+        self.predecessors = {name: [] for name in self.tasks}
+        for src, dst in self.edges:
+            self.successors[src].append(dst)
+            self.predecessors[dst].append(src)
+
+    def sources(self):
+        return [name for name in self.tasks if not self.predecessors[name]]
+
+    def sinks(self):
+        return [name for name in self.tasks if not self.successors[name]]
+
+    def paths(self):
+        """Enumerate all source-to-sink paths (as tuples of task names) in depth-first order."""
+        for source in self.sources():
+            stack = [(source, (source,))]
+            while stack:
+                name, path = stack.pop()
+                if not self.successors[name]:
+                    yield path
+                    continue
+                for nxt in reversed(self.successors[name]):
+                    if nxt in path:
+                        raise ValueError(f"Cause-effect graph {self.id} contains a cycle through {nxt}.")
+                    stack.append((nxt, path + (nxt,)))
+
+
+class _JobTrie:
+    """Trie over task sequences, where each node memoizes for a job of its task the job of the first task of the sequence.
+    step(task, nexttask, jobidx) is the job of nexttask reached from job jobidx of task."""
+    def __init__(self, step):
+        self.step = step
+        self.children = [dict()]  # node 0 is the empty sequence
+        self.parent = [None]
+        self.task = [None]
+        self.memo = [None]
+        self.hits = 0
+        self.misses = 0
+
+    def insert(self, tasks):
+        """Insert a sequence of (name, Task) and return the node of each of its prefixes."""
+        node = 0
+        nodes = []
+        for name, tsk in tasks:
+            if name not in self.children[node]:
+                self.children.append(dict())
+                self.parent.append(node)
+                self.task.append(tsk)
+                self.memo.append(dict())
+                self.children[node][name] = len(self.children) - 1
+            node = self.children[node][name]
+            nodes.append(node)
+        return nodes
+
+    def __len__(self):
+        return len(self.children) - 1
+
+    def first_job(self, node, jobidx):
+        """Job of the first task of the sequence, reached from job jobidx of the last task of the sequence of node."""
+        visited = []
+        while True:
+            parent = self.parent[node]
+            if parent == 0:
+                result = jobidx
+                break
+            memo = self.memo[node]
+            if jobidx in memo:
+                self.hits += 1
+                result = memo[jobidx]
+                break
+            self.misses += 1
+            visited.append((memo, jobidx))
+            jobidx = self.step(self.task[node], self.task[parent], jobidx)
+            node = parent
+        for memo, j in visited:
+            memo[j] = result
+        return result
+
+
+class SharedPaths:
+    """All source-to-sink paths of a cause-effect graph with shared job chain computations."""
+    def __init__(self, graph: CEGraph):
+        self.graph = graph
+        # Backward job chains: prefixes of the paths, stepping to the latest job of the predecessor with write-event no later than the read-event
+        self.prefixes = _JobTrie(lambda tsk, prevtask, jobidx: prevtask.let_we_leq(tsk.re(jobidx)))
+        # Forward job chains: reversed paths, stepping to the earliest job of the successor with read-event no earlier than the write-event
+        self.suffixes = _JobTrie(lambda tsk, nexttask, jobidx: nexttask.let_re_geq(tsk.we(jobidx)))
+
+        self.chains = []
+        for path in graph.paths():
+            tasks = [(name, graph.tasks[name]) for name in path]
+            prefix_nodes = self.prefixes.insert(tasks)
+            suffix_nodes = self.suffixes.insert(tasks[::-1])[::-1]
+            chain_id = path_id(graph.id, path)
+            self.chains.append(PathChain(*[tsk for _, tsk in tasks], id=chain_id, shared=self,
+                                         prefix_nodes=prefix_nodes, suffix_nodes=suffix_nodes))
+
+    def stats(self):
+        """Number of paths, total path length, number of unique prefix/suffix segments and memoization hits/misses."""
+        return {
+            'paths': len(self.chains),
+            'path_tasks': sum(len(chain.tasks) for chain in self.chains),
+            'prefix_segments': len(self.prefixes),
+            'suffix_segments': len(self.suffixes),
+            'memo_hits': self.prefixes.hits + self.suffixes.hits,
+            'memo_misses': self.prefixes.misses + self.suffixes.misses,
+        }
+
+
+class PathChain(CEChain):
+    """A path of a cause-effect graph. Partitioned job chains are computed via the tries of SharedPaths."""
+    def __init__(self, *tasks: Task, id=None, shared=None, prefix_nodes=None, suffix_nodes=None):
+        super().__init__(*tasks, id=id)
+        self.shared = shared
+        self.prefix_nodes = prefix_nodes
+        self.suffix_nodes = suffix_nodes
+
+    def _partbounds(self, taskidx, jobidx):
+        first = self.shared.prefixes.first_job(self.prefix_nodes[taskidx], jobidx)
+        last = self.shared.suffixes.first_job(self.suffix_nodes[taskidx], jobidx + 1)
+        return (self.tasks[0].re(first), self.tasks[-1].we(last))
+
+
+def path_id(graph_id, path):
+    """ID of a path, e.g., 'WATERS2019, LG->LOC->EKF->Planner->DASM'."""
+    return f"{graph_id}, {'->'.join(path)}"
+
+
+##########
+# Data Handling
+##########
+
+def load_graphs_from_jsonl(filepath: str) -> list[CEGraph]:
+    """Load a list of cause-effect graphs from a JSONL file.
+    Each line: {"ID": ..., "tasks": {name: {"phase": ..., "period": ..., "deadline": ...}, ...}, "edges": [[src, dst], ...]}"""
+    graphs = []
+    with open_file(filepath, "r") as f:
+        for line in f:
+            graph_data = json.loads(line.strip())
+            tasks = {name: Task(t["phase"], t["period"], t["deadline"]) for name, t in graph_data["tasks"].items()}
+            graphs.append(CEGraph(tasks, graph_data["edges"], id=graph_data["ID"]))
+    return graphs
+
+
+##########
+# Main
+##########
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze all source-to-sink paths of cause-effect graphs from JSONL file.")
+    parser.add_argument("input", help="Input file (.jsonl)")
+    parser.add_argument("-o", "--output", help="Output file to save results (optional)")
+    parser.add_argument("--save-chains", help="Output file to save the enumerated paths as chains (.jsonl, optional)")
+    parser.add_argument("--no-print", action="store_true", help="Do not print results to stdout")
+    parser.add_argument("-b", "--bound", type=float, help="If set, perform (m,k) and longest exceedance analysis with the given bound")
+    parser.add_argument("-rb", "--relative-bound", type=float, help="If set, perform (m,k) and longest exceedance analysis with the given relative bound (relative_bound * MaxRT)")
+    parser.add_argument("-i", "--info", action="store_true", help="Store additional information such as number of anchor points in the results vector.")
+    parser.add_argument("-t", "--timeout", type=int, help="Set a timeout in seconds.")
+    parser.add_argument("--stats", action="store_true", help="Print statistics about the shared segments to stderr")
+
+    args = parser.parse_args()
+
+    if args.bound is not None and args.relative_bound is not None:
+        print("Error: You cannot specify both --bound and --relative-bound at the same time.")
+        sys.exit(1)
+
+    graphs = load_graphs_from_jsonl(args.input)
+
+    results = []
+    all_chains = []
+    for graph in graphs:
+        shared = SharedPaths(graph)
+        for chain in shared.chains:
+            res = dict()
+            res["ID"] = chain.id
+            res.update(analyze(chain, info=args.info, bound=args.bound, relative_bound=args.relative_bound, timeout_sec=args.timeout,
+                                    compress=False))  # compression would bypass the shared segments
+            results.append(res)
+            if not args.no_print:
+                print(json.dumps(res))
+        all_chains.extend(shared.chains)
+        if args.stats:
+            print(json.dumps(dict({"ID": graph.id}, **shared.stats())), file=sys.stderr)
+
+    if args.output:
+        ensure_filepath_exists(args.output)
+        with open_file(args.output, "w") as f:
+            for r in results:
+                f.write(json.dumps(r) + "\n")
+    if args.save_chains:
+        save_chains_as_jsonl(all_chains, args.save_chains)
+
+
+if __name__ == "__main__":
+    main()
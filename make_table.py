@@ -1,5 +1,6 @@
 import argparse
 import json
+from analysis import open_file
 
 # === Configuration for mapping IDs to LaTeX short names and citations ===
 ID_MAP = {
@@ -43,7 +44,7 @@ args = parser.parse_args()
 
 # === Load precomputed results from results/case_studies.jsonl ===
 results = {}
-with open(args.input, "r") as rf:
+with open_file(args.input, "r") as rf:
     for line in rf:
         entry = json.loads(line)
         results[entry["ID"]] = entry
@@ -0,0 +1,359 @@
+"""Runtime monitor that checks LET event traces of a cause-effect chain against the analysis.
+
+A trace is a stream of read- and write-events of the tasks of a chain, one event per line: '<time> <task index> <R|W>'
+(sorted by time; lines starting with '#' are ignored). Each read-event of the first task samples the input. The samples
+are propagated incrementally along the immediate forward job chains (as _immfw): each running job of a task carries
+the range of samples that it is the first to read, a write-event makes this range available to the next task, and
+the next read-event of the next task takes it over. When a job of the last task writes, the reaction time of its
+samples is known:
+- sample j captures the external activities in [r_{j-1}, r_j) (read-events of the first task), so its reaction time
+  is end_j - r_{j-1}, which is compared with the analyzed reaction time rt(r_{j-1}) (anchor points, see shape.py)
+  and with MaxRT,
+- its data age end_j - r_j is compared with the bound for the analyzed (m,k) guarantee (see mkRT), i.e., in any k
+  consecutive samples at most m exceed the bound.
+Every event takes O(1) amortized time and the memory is bounded by the samples in flight.
+
+Example usage:
+- python3 monitor.py generate chains/case_studies.jsonl --id "WATERS2019, SFM->Planner->DASM" --horizon 100000 -o trace.txt
+- python3 monitor.py chains/case_studies.jsonl --id "WATERS2019, SFM->Planner->DASM" trace.txt -rb 0.9
+- python3 monitor.py check chains/monitor_regression.jsonl -rb 0.9
+"""
+
+import argparse
+import collections
+import heapq
+import json
+import random
+import sys
+
+from analysis import CEChain, MKRange, load_chains_from_jsonl, maximumRT, mkRT, open_file
+from shape import Shape
+
+
+class Monitor:
+    """Streaming monitor for the events of one chain. Alerts (dictionaries with 'kind' 'envelope', 'maxrt' or 'mk')
+    are passed to on_alert, the samples (sample index, r_{j-1}, reaction time, data age, analyzed reaction time) to
+    on_sample. Reaction times above the analyzed ones by more than tolerance are reported."""
+
+    def __init__(self, chain: CEChain, bound=None, relative_bound=None, tolerance=0, on_alert=None, on_sample=None,
+                 max_in_flight=1 << 20):
+        if chain.anchorsRT is None:
+            chain.calc_anchors(compress=True)
+        self.chain = chain
+        self.shape = Shape.from_chain(chain)
+        self.maxrt = maximumRT(chain)
+        self.tolerance = tolerance
+        self.on_alert = on_alert
+        self.on_sample = on_sample
+        self.start = chain.starttimes[0]  # the analysis describes the reaction times from here on
+
+        # (m,k) guarantee: m_k for k in MKRange
+        self.bound = relative_bound * self.maxrt if relative_bound is not None else bound
+        self.mk = None if self.bound is None else {k: m for m, k in mkRT(chain, self.bound)}
+        self.history = 0  # bit i: sample i before the current one exceeded the bound
+        self.history_length = 0
+
+        n = len(chain.tasks)
+        self.running = [collections.deque() for _ in range(n)]  # per task: sample ranges of the running jobs (FIFO)
+        self.ready = [None] * n  # per task: sample range written but not read by the next task yet
+        self.read_times = collections.deque()  # read-events of the first task of the samples in flight
+        self.first_sample = 0  # sample index of read_times[0]
+        self.samples = 0  # number of read-events of the first task
+        self.max_in_flight = max_in_flight  # bound for the samples and jobs in flight (the oldest ones are dropped)
+
+        self.now = None
+        self.pending = []  # events at time now as 2 * task + 1 for write-events, 2 * task for read-events (see event())
+        self.cursor = None  # global index of the anchor point for the last sample (see Shape)
+
+        self.stats = {"events": 0, "samples": 0, "max_rt": None, "max_age": None, "unmatched_writes": 0, "dropped": 0,
+                      "alerts": {"envelope": 0, "maxrt": 0, "mk": 0}}
+
+    def event(self, time, task, kind):
+        """Process one event (kind 'R' or 'W'). Events must be sorted by time. The events at the same time are processed
+        task by task in the order of the chain, and the read-event of a task before its write-event: a read-event reads
+        the data written by the previous task at the same time (as in let_re_geq), and a job with deadline 0 reads
+        before it writes."""
+        self.events(((time, task, kind),))
+
+    def events(self, events):
+        """Process an iterable of events (time, task, kind), see event()."""
+        append = self.pending.append
+        now = self.now
+        count = 0
+        for count, (time, task, kind) in enumerate(events, 1):
+            if time != now:
+                if now is not None and time < now:
+                    raise ValueError(f"Events are not sorted by time: {time} after {now}.")
+                if self.pending:
+                    self._flush()
+                now = self.now = time
+            if kind == "W":
+                append(2 * task + 1)
+            elif kind == "R":
+                append(2 * task)
+            else:
+                raise ValueError(f"Unknown event kind {kind!r} (expected 'R' or 'W').")
+        self.stats["events"] += count
+
+    def _flush(self):
+        # Events at time now, task by task and the read-event of a task before its write-event (see event())
+        running, ready = self.running, self.ready
+        last = len(running) - 1
+        pending = self.pending
+        if len(pending) > 1:
+            pending.sort()
+        for key in pending:
+            task = key >> 1
+            if key & 1:
+                # The oldest running job of the task finishes, its samples are available for the next task
+                if not running[task]:
+                    self.stats["unmatched_writes"] += 1
+                    continue
+                samples = running[task].popleft()
+                if samples is None:
+                    continue
+                if task == last:
+                    self._output(samples, self.now)
+                elif ready[task] is None:
+                    ready[task] = samples
+                else:
+                    ready[task] = (ready[task][0], samples[1])
+                continue
+            # A job of the first task samples the input, a job of another task takes over the samples that are
+            # written but not read yet
+            if task == 0:
+                self.read_times.append(self.now)
+                running[0].append((self.samples, self.samples))
+                self.samples += 1
+                if len(self.read_times) > self.max_in_flight:
+                    self.read_times.popleft()
+                    self.first_sample += 1
+                    self.stats["dropped"] += 1
+            else:
+                running[task].append(ready[task - 1])
+                ready[task - 1] = None
+            if len(running[task]) > self.max_in_flight:
+                running[task].popleft()  # a job without write-event
+        pending.clear()
+
+    def _output(self, samples, end):
+        lo, hi = samples
+        for j in range(max(lo, self.first_sample + 1), hi + 1):  # read_times of dropped samples are not known
+            self._sample(j, self.read_times[j - 1 - self.first_sample], self.read_times[j - self.first_sample], end)
+        # Keep the read-event of the last sample (r_{j-1} of the next sample)
+        while self.first_sample < hi:
+            self.read_times.popleft()
+            self.first_sample += 1
+
+    def _sample(self, j, previous_read, read, end):
+        rt, age = end - previous_read, end - read
+        stats = self.stats
+        stats["samples"] += 1
+        if stats["max_rt"] is None or rt > stats["max_rt"]:
+            stats["max_rt"] = rt
+        if stats["max_age"] is None or age > stats["max_age"]:
+            stats["max_age"] = age
+
+        analyzed = None
+        if previous_read >= self.start:
+            analyzed = self._analyzed_rt(previous_read)
+            if rt > analyzed + self.tolerance:
+                self._alert("envelope", j, previous_read, rt, analyzed)
+            if self.mk is not None:
+                self._check_mk(j, previous_read, age > self.bound)
+        if rt > self.maxrt + self.tolerance:
+            self._alert("maxrt", j, previous_read, rt, self.maxrt)
+        if self.on_sample is not None:
+            self.on_sample(j, previous_read, rt, age, analyzed)
+
+    def _analyzed_rt(self, t):
+        # rt(t) from the anchor points; the cursor only moves forward (amortized O(1) for increasing t)
+        shape = self.shape
+        if self.cursor is None or shape.x(self.cursor) > t:
+            self.cursor = shape._locate(t)
+        while shape.x(self.cursor + 1) <= t:
+            self.cursor += 1
+        return shape.y(self.cursor) - (t - shape.x(self.cursor))
+
+    def _check_mk(self, j, time, fail):
+        self.history = ((self.history << 1) | fail) & ((1 << MKRange[1]) - 1)
+        self.history_length += 1
+        if not fail:
+            return
+        # One alert for the smallest k with more than m_k misses in the last k samples
+        for k, m in self.mk.items():
+            if k <= self.history_length:
+                misses = (self.history & ((1 << k) - 1)).bit_count()
+                if misses > m:
+                    self._alert("mk", j, time, misses, m, k=k)
+                    return
+
+    def _alert(self, kind, j, time, value, limit, **extra):
+        self.stats["alerts"][kind] += 1
+        if self.on_alert is not None:
+            self.on_alert({"kind": kind, "sample": j, "time": time, "value": value, "limit": limit, **extra})
+
+    def finish(self):
+        """Process the remaining events and return the statistics (samples still in flight are not reported)."""
+        self._flush()
+        self.stats["in_flight"] = self.samples - self.first_sample - 1 if self.samples else 0
+        return self.stats
+
+    def run(self, trace, block_size=1 << 22):
+        """Process the events of a trace (text file object with lines '<time> <task index> <R|W>') and return the
+        statistics. The trace is read and parsed in blocks of block_size characters."""
+        rest = ""
+        while True:
+            block = trace.read(block_size)
+            if not block:
+                break
+            block = rest + block
+            cut = block.rfind("\n") + 1
+            rest = block[cut:]
+            self.events(parse_events(block[:cut]))
+        self.events(parse_events(rest))
+        return self.finish()
+
+
+def parse_events(text):
+    """Events (time, task, kind) of the lines '<time> <task index> <R|W>' in text (lines starting with '#' are ignored)."""
+    if "#" in text:
+        text = "\n".join(line for line in text.splitlines() if not line.lstrip().startswith("#"))
+    tokens = text.split()
+    if len(tokens) % 3:
+        raise ValueError("Malformed trace: each line must have the form '<time> <task index> <R|W>'.")
+    try:
+        times = list(map(int, tokens[0::3]))
+    except ValueError:
+        times = list(map(float, tokens[0::3]))
+    return zip(times, map(int, tokens[1::3]), tokens[2::3])
+
+
+def generate_trace(chain: CEChain, horizon, jitter=0, seed=None):
+    """Events '(time, task, kind)' of all jobs of the chain with read-event before horizon, sorted by time and, at the
+    same time, by task index. With jitter > 0, each write-event is delayed randomly by up to jitter (integer times),
+    which violates the LET assumption and can exceed the analyzed reaction times."""
+    rng = random.Random(seed)
+
+    def task_events(idx, tsk):
+        # Read- and write-events of one task in time order (write-events of earlier jobs can be later than read-events)
+        pending = []
+        job = 0
+        while tsk.re(job) < horizon:
+            while pending and pending[0] <= tsk.re(job):
+                yield (heapq.heappop(pending), idx, "W")
+            yield (tsk.re(job), idx, "R")
+            heapq.heappush(pending, tsk.we(job) + (rng.randint(0, jitter) if jitter else 0))
+            job += 1
+        while pending:
+            yield (heapq.heappop(pending), idx, "W")
+
+    return heapq.merge(*[task_events(idx, tsk) for idx, tsk in enumerate(chain.tasks)], key=lambda event: event[:2])
+
+
+##########
+# Main
+##########
+
+def _load_chain(filepath, id):
+    try:
+        return load_chains_from_jsonl(filepath, ids=[id])[0]
+    except KeyError as e:
+        print(f"Error: {e.args[0]}")
+        sys.exit(1)
+
+
+def generate_main(argv):
+    parser = argparse.ArgumentParser(prog="monitor.py generate", description="Generate an LET event trace of a chain.")
+    parser.add_argument("input", help="Input file with chains (.jsonl)")
+    parser.add_argument("--id", required=True, help="ID of the chain")
+    parser.add_argument("--horizon", type=int, required=True, help="Generate all jobs with read-event before this time")
+    parser.add_argument("--jitter", type=int, default=0, help="Delay each write-event randomly by up to this value (default: 0, i.e., exact LET)")
+    parser.add_argument("--seed", type=int, help="Random seed for the jitter")
+    parser.add_argument("-o", "--output", default="-", help="Output file for the trace (default: stdout)")
+    args = parser.parse_args(argv)
+
+    chain = _load_chain(args.input, args.id)
+    out = sys.stdout if args.output == "-" else open_file(args.output, "w")
+    try:
+        out.writelines(f"{time} {idx} {kind}\n" for time, idx, kind in generate_trace(chain, args.horizon, jitter=args.jitter, seed=args.seed))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def check_main(argv):
+    parser = argparse.ArgumentParser(prog="monitor.py check", description="Monitor the exact LET trace of each chain; any alert or unmatched write-event indicates an inconsistency of the monitor and the analysis.")
+    parser.add_argument("input", help="Input file with chains (.jsonl)")
+    parser.add_argument("--ids", nargs='+', help="Only the chains with these IDs")
+    parser.add_argument("--hyperperiods", type=int, default=2, help="Number of hyperperiods after the warm-up (default: 2)")
+    parser.add_argument("-b", "--bound", type=float, help="If set, also check the (m,k) guarantee for the given bound")
+    parser.add_argument("-rb", "--relative-bound", type=float, help="If set, also check the (m,k) guarantee for the given relative bound (relative_bound * MaxRT)")
+    args = parser.parse_args(argv)
+
+    if args.bound is not None and args.relative_bound is not None:
+        print("Error: You cannot specify both --bound and --relative-bound at the same time.")
+        sys.exit(1)
+
+    try:
+        chains = load_chains_from_jsonl(args.input, ids=args.ids)
+    except KeyError as e:
+        print(f"Error: {e.args[0]}")
+        sys.exit(1)
+
+    failed = 0
+    for chain in chains:
+        monitor = Monitor(chain, bound=args.bound, relative_bound=args.relative_bound)
+        # All samples of the hyperperiods after the warm-up complete before the horizon
+        horizon = monitor.start + args.hyperperiods * chain.hyperperiod + monitor.maxrt + 1
+        monitor.events(generate_trace(chain, horizon))
+        stats = monitor.finish()
+        ok = not any(stats["alerts"].values()) and not stats["unmatched_writes"]
+        failed += not ok
+        print(json.dumps({"ID": chain.id, "ok": ok, "samples": stats["samples"], "unmatched_writes": stats["unmatched_writes"], "alerts": stats["alerts"]}))
+    print(f"{len(chains) - failed} of {len(chains)} chains consistent.")
+    return 1 if failed else 0
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "generate":
+        return generate_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == "check":
+        return check_main(sys.argv[2:])
+
+    parser = argparse.ArgumentParser(description="Check an LET event trace of a chain against the analysis. Subcommand 'generate' creates traces (see 'monitor.py generate -h'), subcommand 'check' monitors the exact traces of chains (see 'monitor.py check -h').")
+    parser.add_argument("input", help="Input file with chains (.jsonl)")
+    parser.add_argument("trace", help="Trace file with lines '<time> <task index> <R|W>' ('-' for stdin, compressed for .gz/.bz2/.xz)")
+    parser.add_argument("--id", required=True, help="ID of the chain")
+    parser.add_argument("-b", "--bound", type=float, help="If set, check the (m,k) guarantee of the analysis for the given bound")
+    parser.add_argument("-rb", "--relative-bound", type=float, help="If set, check the (m,k) guarantee of the analysis for the given relative bound (relative_bound * MaxRT)")
+    parser.add_argument("--tolerance", type=float, default=0, help="Only report reaction times that exceed the analyzed ones by more than this value (default: 0)")
+    parser.add_argument("--samples", action="store_true", help="Print the observed reaction time of each sample")
+    parser.add_argument("--max-in-flight", type=int, default=1 << 20, help="Maximal number of samples and jobs per task in flight; the oldest ones are dropped (default: 2^20)")
+    parser.add_argument("--no-alerts", action="store_true", help="Do not print the alerts (only the summary)")
+    args = parser.parse_args()
+
+    if args.bound is not None and args.relative_bound is not None:
+        print("Error: You cannot specify both --bound and --relative-bound at the same time.")
+        sys.exit(1)
+
+    chain = _load_chain(args.input, args.id)
+    on_alert = None if args.no_alerts else (lambda alert: print(json.dumps({"alert": alert})))
+    on_sample = None
+    if args.samples:
+        on_sample = lambda j, time, rt, age, analyzed: print(json.dumps({"sample": j, "time": time, "RT": rt, "age": age, "analyzed_RT": analyzed}))
+    monitor = Monitor(chain, bound=args.bound, relative_bound=args.relative_bound, tolerance=args.tolerance,
+                      on_alert=on_alert, on_sample=on_sample, max_in_flight=args.max_in_flight)
+
+    trace = sys.stdin if args.trace == "-" else open_file(args.trace, "r")
+    try:
+        stats = monitor.run(trace)
+    finally:
+        if trace is not sys.stdin:
+            trace.close()
+    print(json.dumps({"ID": chain.id, "MaxRT": monitor.maxrt, "mkRT": None if monitor.mk is None else [[m, k] for k, m in monitor.mk.items()], **stats}))
+    return 1 if any(stats["alerts"].values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,314 @@
+"""Phase-assignment optimizer: search integer task phases that minimize a metric of a cause-effect chain.
+
+The metrics only depend on the phases modulo the periods and are invariant under shifting all tasks by the same
+time. Hence, the phase of the first task is fixed to 0 and the phase of every other task is searched in [0, period).
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import random
+import sys
+import time
+
+from analysis import CEChain, Task, MKRange, load_chains_from_jsonl, save_chains_as_jsonl, ensure_filepath_exists
+from analysis import averageRT, reactive, mkRT
+
+METRICS = ['MaxRT', 'AvRT', 'Reac', 'mkRT']
+
+
+class Evaluator:
+    """Evaluates a metric for phase vectors of a fixed chain structure (periods and deadlines).
+    The hyperperiods and partitioning tasks of the chain and of all its prefixes are computed only once."""
+
+    def __init__(self, periods, deadlines, metric='MaxRT', bound=None, k=MKRange[1]):
+        assert metric in METRICS, f"{metric} is not a possible metric."
+        assert metric != 'mkRT' or bound is not None, "mkRT requires a bound"
+        self.periods = list(periods)
+        self.deadlines = list(deadlines)
+        self.metric = metric
+        self.bound = bound
+        self.k = k
+
+        n = len(self.periods)
+        # Hyperperiod and partitioning task (maximal period) of each prefix tasks[:length]
+        self.hyperperiods = [None] + [math.lcm(*self.periods[:length]) for length in range(1, n + 1)]
+        self.partitions = [None] + [max(range(length), key=lambda i: self.periods[i]) for length in range(1, n + 1)]
+        # Sum of deadlines of each suffix tasks[length:]
+        self.rest_deadlines = [sum(self.deadlines[length:]) for length in range(n + 1)]
+
+    def lower_bound(self):
+        """Lower bound on the metric for any phases (-inf if not available).
+        Every partitioned job chain spans all deadlines and one period of the partitioning task."""
+        if self.metric == 'MaxRT':
+            return sum(self.deadlines) + max(self.periods)
+        return -math.inf
+
+    def _chain(self, phases):
+        length = len(phases)
+        chain = CEChain(*[Task(phi, per, dl) for phi, per, dl in zip(phases, self.periods, self.deadlines)], id=0)
+        chain.hyperperiod = self.hyperperiods[length]
+        return chain
+
+    def evaluate(self, phases, cutoff=math.inf):
+        """Metric for the chain prefix with the given phases.
+        For MaxRT the evaluation is aborted (returns None) once a partitioned job chain reaches the cutoff."""
+        chain = self._chain(phases)
+        p = self.partitions[len(phases)]
+        if self.metric == 'MaxRT':
+            value = -math.inf
+            for partstart, partend in chain.iter_parts(p):
+                value = max(value, partend - partstart)
+                if value >= cutoff:
+                    return None
+            return value
+
+        chain.calc_anchors(p)
+        if self.metric == 'AvRT':
+            return averageRT(chain)
+        elif self.metric == 'Reac':
+            return reactive(chain)
+        elif self.metric == 'mkRT':
+            # The prefix is compared against the bound minus the deadlines of the remaining tasks
+            return mkRT(chain, self.bound - self.rest_deadlines[len(phases)])[self.k - MKRange[0]][0]
+
+    def prefix_bound(self, phases, cutoff=math.inf):
+        """Lower bound on the metric of every completion of the phase prefix (-inf if not available, None if the bound reaches the cutoff).
+        The reaction time of the full chain is at least the reaction time of the prefix plus the deadlines of the remaining tasks."""
+        rest = self.rest_deadlines[len(phases)]
+        if self.metric in ('MaxRT', 'AvRT'):
+            value = self.evaluate(phases, cutoff - rest)
+            return None if value is None else value + rest
+        elif self.metric == 'mkRT':
+            return self.evaluate(phases)
+        return -math.inf
+
+
+##########
+# Exhaustive search (branch and bound)
+##########
+
+_evaluator = None
+_shared_best = None
+
+def _init_worker(evaluator, shared_best):
+    global _evaluator, _shared_best
+    _evaluator = evaluator
+    _shared_best = shared_best
+
+
+def _branch_and_bound(evaluator, phases, shared_best, stats):
+    """Depth-first search over the phases of the remaining tasks. Returns (value, phases) of the best completion found."""
+    n = len(evaluator.periods)
+    best = (math.inf, None)
+
+    if len(phases) == n:
+        value = evaluator.evaluate(phases, cutoff=shared_best.value)
+        stats[0] += 1
+        if value is not None and value < shared_best.value:
+            with shared_best.get_lock():
+                if value < shared_best.value:
+                    shared_best.value = value
+            best = (value, list(phases))
+        return best
+
+    if len(phases) >= 2:
+        bound = evaluator.prefix_bound(phases, cutoff=shared_best.value)
+        stats[0] += 1
+        if bound is None or bound >= shared_best.value:
+            stats[1] += 1
+            return best
+
+    lb = evaluator.lower_bound()
+    for phi in range(evaluator.periods[len(phases)]):
+        res = _branch_and_bound(evaluator, phases + [phi], shared_best, stats)
+        if res[0] < best[0]:
+            best = res
+        if shared_best.value <= lb:
+            break  # optimal
+    return best
+
+
+def _branch_and_bound_worker(phases):
+    stats = [0, 0]
+    value, best_phases = _branch_and_bound(_evaluator, phases, _shared_best, stats)
+    return value, best_phases, stats
+
+
+def exhaustive(evaluator: Evaluator, start=None, jobs=None):
+    """Exact minimum over all phase vectors by branch and bound. Subtrees for the phases of the second task are searched in parallel.
+    Returns (value, phases, number of evaluations, number of pruned subtrees)."""
+    shared_best = multiprocessing.Value('d', math.inf)
+    best = (math.inf, None)
+    evaluations = pruned = 0
+
+    # Use the start vector as initial incumbent for pruning
+    if start is not None:
+        value = evaluator.evaluate(start)
+        shared_best.value = value
+        best = (value, list(start))
+        evaluations += 1
+
+    if len(evaluator.periods) == 1:
+        return evaluator.evaluate([0]), [0], evaluations + 1, 0
+
+    subtrees = [[0, phi] for phi in range(evaluator.periods[1])]
+    if jobs == 1:
+        _init_worker(evaluator, shared_best)
+        results = map(_branch_and_bound_worker, subtrees)
+    else:
+        pool = multiprocessing.Pool(jobs, initializer=_init_worker, initargs=(evaluator, shared_best))
+        results = pool.imap_unordered(_branch_and_bound_worker, subtrees)
+
+    for value, phases, stats in results:
+        evaluations += stats[0]
+        pruned += stats[1]
+        if phases is not None and value < best[0]:
+            best = (value, phases)
+
+    if jobs != 1:
+        pool.close()
+        pool.join()
+    return best[0], best[1], evaluations, pruned
+
+
+##########
+# Local search (coordinate descent)
+##########
+
+def _evaluate_worker(args):
+    phases, cutoff = args
+    return _evaluator.evaluate(phases, cutoff)
+
+
+def local_search(evaluator: Evaluator, start, restarts=0, jobs=None, rng=None):
+    """Coordinate descent: repeatedly optimize the phase of one task at a time (all candidate phases are evaluated in parallel)
+    until no single task can be improved. Additional random restarts can be used.
+    Returns (value, phases, number of evaluations, number of aborted evaluations)."""
+    rng = rng or random.Random()
+    n = len(evaluator.periods)
+    lb = evaluator.lower_bound()
+    evaluations = pruned = 0
+
+    if jobs == 1:
+        _init_worker(evaluator, None)
+        pool = None
+        mapper = map
+    else:
+        pool = multiprocessing.Pool(jobs, initializer=_init_worker, initargs=(evaluator, None))
+        mapper = lambda f, it: pool.map(f, list(it), chunksize=16)
+
+    best = (math.inf, None)
+    for restart in range(restarts + 1):
+        if restart == 0:
+            phases = [0] + [phi % per for phi, per in zip(start[1:], evaluator.periods[1:])]
+        else:
+            phases = [0] + [rng.randrange(per) for per in evaluator.periods[1:]]
+        value = evaluator.evaluate(phases)
+        evaluations += 1
+
+        improved = True
+        while improved and value > lb:
+            improved = False
+            for taskidx in range(1, n):
+                candidates = [phases[:taskidx] + [phi] + phases[taskidx+1:] for phi in range(evaluator.periods[taskidx]) if phi != phases[taskidx]]
+                values = list(mapper(_evaluate_worker, ((cand, value) for cand in candidates)))
+                evaluations += len(candidates)
+                pruned += sum(v is None for v in values)
+                for cand, v in zip(candidates, values):
+                    if v is not None and v < value:
+                        value, phases, improved = v, cand, True
+                if value <= lb:
+                    break
+
+        if value < best[0]:
+            best = (value, phases)
+        if best[0] <= lb:
+            break  # optimal
+
+    if pool is not None:
+        pool.close()
+        pool.join()
+    return best[0], best[1], evaluations, pruned
+
+
+def optimize_phases(chain: CEChain, metric='MaxRT', bound=None, k=MKRange[1], method='local', restarts=0, jobs=None, seed=None):
+    """Optimize the phases of a chain. Returns a dictionary with the results and the optimized chain."""
+    start_time = time.time()
+    evaluator = Evaluator([tsk.period for tsk in chain.tasks], [tsk.deadline for tsk in chain.tasks], metric=metric, bound=bound, k=k)
+    start = [tsk.phase - chain.tasks[0].phase for tsk in chain.tasks]
+    start = [phi % per for phi, per in zip(start, evaluator.periods)]
+
+    before = evaluator.evaluate(start)
+    if method == 'exhaustive':
+        value, phases, evaluations, pruned = exhaustive(evaluator, start=start, jobs=jobs)
+    elif method == 'local':
+        value, phases, evaluations, pruned = local_search(evaluator, start, restarts=restarts, jobs=jobs, rng=random.Random(seed))
+    else:
+        raise ValueError(f'{method} is not a possible method.')
+
+    results = {
+        "ID": chain.id,
+        "metric": metric,
+        "before": before,
+        "after": value,
+        "phases": phases,
+        "evaluations": evaluations,
+        "pruned": pruned,
+        "optimization_time_sec": time.time() - start_time,
+    }
+    optimized = CEChain(*[Task(phi, tsk.period, tsk.deadline) for phi, tsk in zip(phases, chain.tasks)], id=chain.id)
+    return results, optimized
+
+
+##########
+# Main
+##########
+
+def main():
+    parser = argparse.ArgumentParser(description="Optimize the task phases of CEChains from JSONL file.")
+    parser.add_argument("input", help="Input file (.jsonl)")
+    parser.add_argument("-o", "--output", help="Output file to save results (optional)")
+    parser.add_argument("--save-chains", help="Output file to save the chains with optimized phases (.jsonl, optional)")
+    parser.add_argument("--no-print", action="store_true", help="Do not print results to stdout")
+    parser.add_argument("-m", "--metric", choices=METRICS, default='MaxRT', help="Metric to be minimized (default: MaxRT)")
+    parser.add_argument("-b", "--bound", type=float, help="Bound for the metric mkRT")
+    parser.add_argument("-k", type=int, default=MKRange[1], help=f"For the metric mkRT: minimize m of the (m,k) constraint for this k (default: {MKRange[1]})")
+    parser.add_argument("--method", choices=['local', 'exhaustive'], default='local', help="Search method: coordinate descent 'local' or exact branch and bound 'exhaustive' (default: local)")
+    parser.add_argument("--restarts", type=int, default=0, help="Number of random restarts for the local search (default: 0)")
+    parser.add_argument("-j", "--jobs", type=int, help="Number of parallel processes (default: number of CPUs)")
+    parser.add_argument("--seed", type=int, help="Random seed for the restarts")
+
+    args = parser.parse_args()
+
+    if args.metric == 'mkRT' and args.bound is None:
+        print("Error: The metric mkRT requires a bound.")
+        sys.exit(1)
+    if not MKRange[0] <= args.k <= MKRange[1]:
+        print(f"Error: k has to be in {MKRange}.")
+        sys.exit(1)
+
+    chains = load_chains_from_jsonl(args.input)
+
+    results = []
+    optimized_chains = []
+    for chain in chains:
+        res, optimized = optimize_phases(chain, metric=args.metric, bound=args.bound, k=args.k, method=args.method,
+                                         restarts=args.restarts, jobs=args.jobs, seed=args.seed)
+        results.append(res)
+        optimized_chains.append(optimized)
+        if not args.no_print:
+            print(json.dumps(res))
+
+    if args.output:
+        ensure_filepath_exists(args.output)
+        with open(args.output, "w") as f:
+            for r in results:
+                f.write(json.dumps(r) + "\n")
+    if args.save_chains:
+        save_chains_as_jsonl(optimized_chains, args.save_chains)
+
+
+if __name__ == "__main__":
+    main()
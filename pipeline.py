@@ -0,0 +1,250 @@
+"""In-memory pipeline: generate -> analyze -> aggregate.
+
+Producers generate cause-effect chains (or stream them from a file), workers analyze them, and the main process
+aggregates the results. The stages are connected by bounded queues, so producers are throttled when the workers
+cannot keep up. Only the aggregated statistics (and optionally the raw results) are written.
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import queue
+import random
+import statistics
+import sys
+import threading
+
+from analysis import analyze, ensure_filepath_exists, open_file, CEChain, Task
+
+
+##########
+# Stages
+##########
+
+def _produce_generated(chain_queue, bench, number_tasks, ids, maxHTp, maxH, seed):
+    """Producer: generate chains with the given IDs."""
+    import numpy
+    from generate import gen_chain
+    # Reseed, otherwise forked producers would generate identical chains
+    random.seed(seed)
+    numpy.random.seed(None if seed is None else seed % 2**32)
+    for id in ids:
+        chain_queue.put(gen_chain(bench, number_tasks, id, maxHTp=maxHTp, maxH=maxH))
+
+
+def _produce_file(chain_queue, filepath):
+    """Producer: stream chains from a JSONL file."""
+    with open_file(filepath, "r") as f:
+        for line in f:
+            chain_data = json.loads(line.strip())
+            tasks = [Task(t["phase"], t["period"], t["deadline"]) for t in chain_data["tasks"]]
+            chain_queue.put(CEChain(*tasks, id=chain_data["ID"]))
+
+
+def _reset(chain: CEChain):
+    """Remove all computed features from a chain."""
+    chain.hyperperiod = None
+    chain.warmup = None
+    chain.starttimes = None
+    chain.anchorsRT = None
+
+
+def _work(chain_queue, result_queue, analysis_args, repeat):
+    """Worker: analyze chains until a None is received. If the analysis of a chain fails, an error record
+    {"ID": ..., "error": ...} is sent instead of its results."""
+    try:
+        while True:
+            chain = chain_queue.get()
+            if chain is None:
+                break
+            try:
+                runtimes = []
+                for _ in range(repeat):
+                    _reset(chain)
+                    res = dict()
+                    res["ID"] = chain.id
+                    res.update(analyze(chain, **analysis_args))
+                    runtimes.append(res['analysis_time_sec'])
+                # Median runtime over all repetitions
+                res['analysis_time_sec'] = statistics.median(runtimes)
+            except Exception as e:
+                res = {"ID": chain.id, "error": f"{type(e).__name__}: {e}"}
+            result_queue.put(res)
+    finally:
+        result_queue.put(None)
+
+
+class Aggregator:
+    """Streaming statistics (count, sum, min, max, mean) for each numeric entry of the results."""
+
+    def __init__(self):
+        self.chains = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.crashed_workers = 0
+        self.stats = dict()
+
+    def add(self, res: dict):
+        self.chains += 1
+        if 'error' in res:
+            self.errors += 1
+            return
+        if 'MaxRT' not in res:
+            self.timeouts += 1
+        for key, value in res.items():
+            if key == "ID" or isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            if key not in self.stats:
+                self.stats[key] = {'count': 0, 'sum': 0, 'min': math.inf, 'max': -math.inf, 'min_ID': None, 'max_ID': None}
+            st = self.stats[key]
+            st['count'] += 1
+            st['sum'] += value
+            if value < st['min']:
+                st['min'], st['min_ID'] = value, res["ID"]
+            if value > st['max']:
+                st['max'], st['max_ID'] = value, res["ID"]
+
+    def summary(self) -> dict:
+        summary = {'chains': self.chains, 'timeouts': self.timeouts, 'errors': self.errors,
+                   'crashed_workers': self.crashed_workers, 'metrics': dict()}
+        for key, st in self.stats.items():
+            summary['metrics'][key] = dict(st, mean=st['sum'] / st['count'])
+        return summary
+
+
+def run_pipeline(source, workers=None, producers=1, queue_size=64, repeat=1, on_result=None, **analysis_args):
+    """Run the pipeline and return the Aggregator.
+    - source: ('file', filepath) or ('generate', bench, number_tasks, number_chains, startid, maxHTp, maxH, seed)
+    - on_result: optional callback for each raw result (e.g., to store them)
+    - analysis_args: passed to analyze()"""
+    if repeat < 1:
+        raise ValueError(f'repeat must be at least 1, got {repeat}.')
+    workers = workers or multiprocessing.cpu_count()
+    chain_queue = multiprocessing.Queue(maxsize=queue_size)
+    result_queue = multiprocessing.Queue(maxsize=queue_size)
+
+    # Producers
+    if source[0] == 'file':
+        producer_procs = [multiprocessing.Process(target=_produce_file, args=(chain_queue, source[1]))]
+    elif source[0] == 'generate':
+        _, bench, number_tasks, number_chains, startid, maxHTp, maxH, seed = source
+        ids = list(range(startid, startid + number_chains))
+        producer_procs = [multiprocessing.Process(target=_produce_generated, args=(
+            chain_queue, bench, number_tasks, ids[k::producers], maxHTp, maxH,
+            None if seed is None else seed + k)) for k in range(producers)]
+    else:
+        raise ValueError(f'{source[0]} is not a possible source.')
+
+    worker_procs = [multiprocessing.Process(target=_work, args=(chain_queue, result_queue, analysis_args, repeat)) for _ in range(workers)]
+
+    for proc in producer_procs + worker_procs:
+        proc.start()
+
+    def close_chain_queue():
+        # Stop workers once all producers are done
+        for proc in producer_procs:
+            proc.join()
+        for _ in worker_procs:
+            chain_queue.put(None)
+    closer = threading.Thread(target=close_chain_queue, daemon=True)
+    closer.start()
+
+    # Aggregate
+    aggregator = Aggregator()
+    running = len(worker_procs)
+    while running > 0:
+        try:
+            res = result_queue.get(timeout=1)
+        except queue.Empty:
+            # A worker that was killed (e.g., by the OS) cannot send its None
+            if not any(proc.is_alive() for proc in worker_procs):
+                break
+            continue
+        if res is None:
+            running -= 1
+            continue
+        aggregator.add(res)
+        if on_result is not None:
+            on_result(res)
+
+    for proc in worker_procs:
+        proc.join()
+    aggregator.crashed_workers = sum(proc.exitcode != 0 for proc in worker_procs)
+    if aggregator.crashed_workers:
+        # The remaining chains are not analyzed; producers and the closer could block on the full chain queue
+        for proc in producer_procs:
+            proc.terminate()
+        chain_queue.cancel_join_thread()
+    else:
+        closer.join()
+
+    return aggregator
+
+
+##########
+# Main
+##########
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate, analyze and aggregate CEChains in memory, without intermediate files.")
+    parser.add_argument("--input", help="Stream chains from this file (.jsonl) instead of generating them")
+    parser.add_argument("--bench", choices=["WATERS", "UNI"], default="WATERS", help="Benchmark type: WATERS or UNI (default: WATERS)")
+    parser.add_argument("--tasks", type=int, default=5, help="Number of tasks per chain (default: 5)")
+    parser.add_argument("--sets", type=int, default=10, help="Number of chains to generate (default:10)")
+    parser.add_argument("--startid", type=int, default=0, help="ID of the first chain.")
+    parser.add_argument("--maxH", type=int, default=None, help="Maximal allowed value of Hyperperiod. (For generator UNIFORM only.)")
+    parser.add_argument("--maxHTp", type=int, default=None, help="Maximal allowed value of Hyperperiod / maximal period. (For generator UNIFORM only.)")
+    parser.add_argument("--seed", type=int, help="Random seed for the generation")
+    parser.add_argument("--producers", type=int, default=1, help="Number of producer processes (default: 1)")
+    parser.add_argument("--workers", type=int, help="Number of worker processes (default: number of CPUs)")
+    parser.add_argument("--queue-size", type=int, default=64, help="Capacity of the queues between the stages (default: 64)")
+    parser.add_argument("--repeat", type=int, default=1, help="Analyze each chain multiple times and report the median analysis time (default: 1)")
+    parser.add_argument("-b", "--bound", type=float, help="If set, perform (m,k) and longest exceedance analysis with the given bound")
+    parser.add_argument("-rb", "--relative-bound", type=float, help="If set, perform (m,k) and longest exceedance analysis with the given relative bound (relative_bound * MaxRT)")
+    parser.add_argument("-i", "--info", action="store_true", help="Store additional information such as number of anchor points in the results vector.")
+    parser.add_argument("-t", "--timeout", type=int, help="Set a timeout in seconds.")
+    parser.add_argument("-s", "--stats", help="Output file to save the aggregated statistics (.json). Printed to stdout if not set.")
+    parser.add_argument("-o", "--output", help="Output file to save the raw results (.jsonl, optional)")
+
+    args = parser.parse_args()
+
+    if args.bound is not None and args.relative_bound is not None:
+        print("Error: You cannot specify both --bound and --relative-bound at the same time.")
+        sys.exit(1)
+
+    if args.repeat < 1:
+        print("Error: --repeat must be at least 1.")
+        sys.exit(1)
+
+    if args.input:
+        source = ('file', args.input)
+    else:
+        source = ('generate', args.bench, args.tasks, args.sets, args.startid, args.maxHTp, args.maxH, args.seed)
+
+    raw_file = None
+    on_result = None
+    if args.output:
+        ensure_filepath_exists(args.output)
+        raw_file = open_file(args.output, "w")
+        on_result = lambda res: raw_file.write(json.dumps(res) + "\n")
+
+    try:
+        aggregator = run_pipeline(source, workers=args.workers, producers=args.producers, queue_size=args.queue_size,
+                                  repeat=args.repeat, on_result=on_result, info=args.info, bound=args.bound,
+                                  relative_bound=args.relative_bound, timeout_sec=args.timeout)
+    finally:
+        if raw_file is not None:
+            raw_file.close()
+
+    summary = aggregator.summary()
+    if args.stats:
+        ensure_filepath_exists(args.stats)
+        with open(args.stats, "w") as f:
+            json.dump(summary, f, indent=4)
+    else:
+        print(json.dumps(summary, indent=4))
+
+
+if __name__ == "__main__":
+    main()
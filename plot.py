@@ -3,6 +3,7 @@
 import argparse
 import json
 import statistics
+from analysis import open_file
 import matplotlib.pyplot as plt
 
 plt.rcParams.update({'font.size': 18})
@@ -95,7 +96,7 @@ def main():
 
             counter = 0
 
-        with open(filename, "r") as f:
+        with open_file(filename, "r") as f:
             for line in f:
                 res = json.loads(line.strip())
                 assert "#AnchorsRT" in res, "Info in results file is missing. Run analysis with '--info' to obtain information for plotting"
@@ -4,6 +4,7 @@ import argparse
 import json
 import statistics
 from typing import List
+from analysis import open_file
 import matplotlib.pyplot as plt
 from matplotlib.ticker import AutoMinorLocator
 from matplotlib.cbook import boxplot_stats
@@ -82,14 +83,14 @@ def main():
 
         # Read first file to determine number of lines
         per_line = []
-        with open(filenames[0], "r") as f:
+        with open_file(filenames[0], "r") as f:
             for line in f:
                 res = json.loads(line)
                 per_line.append([res[keyword]])
 
         # Process remaining files
         for filename in filenames[1:]:
-            with open(filename, "r") as f:
+            with open_file(filename, "r") as f:
                 for i, line in enumerate(f):
                     res = json.loads(line)
                     per_line[i].append(res[keyword])
@@ -0,0 +1,145 @@
+"""Metrics of all contiguous sub-chains (segments) of a cause-effect chain in one shared computation.
+
+The segment tasks[i..j] is analyzed like a chain of its own: its anchor points follow from the partitioned job chains
+at its partitioning task p (the first task with maximal period in the segment), i.e., from the immediate backward
+job chain of job k of task p down to task i and the immediate forward job chain of job k+1 down to task j. These job
+chains do not depend on the tasks outside of the segment, so all segments with the same partitioning task share
+them: for each task p and job k, the backward and forward job chains are computed once (down to the first and last
+task of all such segments) and each segment reads its start and end in O(1). This replaces O(n^2) separate sweeps
+over job chains of length O(n) by O(n) sweeps.
+
+Example usage:
+- python3 segments.py chains/case_studies.jsonl --metrics MaxRT AvRT
+"""
+
+import argparse
+import json
+import math
+import sys
+
+import numpy as np
+
+from analysis import METRICS, CEChain, _AnchorReducer, load_chains_from_jsonl, open_file, plan_metrics
+
+
+def segment_chains(chain: CEChain) -> dict:
+    """The segments tasks[i..j] (i <= j) as chains, keyed by (i, j)."""
+    n = len(chain.tasks)
+    return {(i, j): CEChain(*chain.tasks[i:j + 1], id=f"{chain.id}[{i}..{j}]") for i in range(n) for j in range(i, n)}
+
+
+def calc_segment_anchors(chain: CEChain, segments=None) -> dict:
+    """Calculate the anchor points (anchorsRT) of all segments of the chain (see segment_chains()) with shared
+    partitioned job chains. The anchor points are the same as those of calc_anchors() on each segment."""
+    tasks = chain.tasks
+    if segments is None:
+        segments = segment_chains(chain)
+
+    # Segments by partitioning task: (i, j, first job, end of jobs, reducer)
+    groups = dict()
+    for (i, j), seg in segments.items():
+        seg.calc_hyperperiod()
+        seg.calc_warmup()
+        p = max(range(len(seg.tasks)), key=lambda idx: seg.tasks[idx].period)
+        first = seg.warmup[p]
+        groups.setdefault(i + p, []).append((i, j, first, first + seg.hyperperiod // seg.tasks[p].period, _AnchorReducer()))
+
+    for p, group in groups.items():
+        lowest = min(i for i, _, _, _, _ in group)
+        highest = max(j for _, j, _, _, _ in group)
+        starts = [None] * len(tasks)
+        ends = [None] * len(tasks)
+        for jobidx in range(min(g[2] for g in group), max(g[3] for g in group)):
+            # Partitioned job chain at job jobidx of task p: immediate backward job chain (see CEChain._immbw) ...
+            job = jobidx
+            starts[p] = tasks[p].re(job)
+            for t in range(p, lowest, -1):
+                job = tasks[t - 1].let_we_leq(tasks[t].re(job))
+                starts[t - 1] = tasks[t - 1].re(job)
+            # ... and immediate forward job chain of the next job (see CEChain._immfw)
+            job = jobidx + 1
+            ends[p] = tasks[p].we(job)
+            for t in range(p, highest):
+                job = tasks[t + 1].let_re_geq(tasks[t].we(job))
+                ends[t + 1] = tasks[t + 1].we(job)
+
+            for i, j, first, end, reducer in group:
+                if first <= jobidx < end:
+                    reducer.add(starts[i], ends[j] - starts[i])
+
+        for i, j, _, _, reducer in group:
+            seg = segments[(i, j)]
+            seg.anchorsRT = reducer.finish(seg.hyperperiod)
+            seg.anchors_path = 'enumeration'
+    return segments
+
+
+def segment_matrix(chain: CEChain, metrics=('MaxRT', 'AvRT'), bound=None, relative_bound=None) -> dict:
+    """Metrics of all segments tasks[i..j] of the chain (see calc_segment_anchors()).
+    Returns an n x n array per metric with the value of segment tasks[i..j] at [i, j] (NaN for i > j).
+    Metrics with a bound (LE-RT) use the bound or the relative bound w.r.t. the MaxRT of each segment; mkRT is not
+    supported (no scalar value)."""
+    metrics = list(metrics)
+    if 'mkRT' in metrics:
+        raise ValueError('mkRT is not a possible metric for segment_matrix (no scalar value).')
+    plan = plan_metrics(metrics, bound, relative_bound)
+
+    n = len(chain.tasks)
+    matrices = {m: np.full((n, n), np.nan) for m in metrics}
+    for (i, j), seg in calc_segment_anchors(chain).items():
+        values = dict()
+        for m in plan:
+            if m == 'LE-RT' and relative_bound:
+                bound = relative_bound * values['MaxRT']
+            values[m] = METRICS[m][1](seg, values, bound)
+        for m in metrics:
+            matrices[m][i, j] = values[m]
+    return matrices
+
+
+##########
+# Main
+##########
+
+def _matrix_as_list(matrix):
+    # NaN (no segment) as None, so that the output is valid JSON
+    return [[None if math.isnan(value) else value for value in row] for row in matrix.tolist()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Metrics of all contiguous sub-chains tasks[i..j] of each chain as n x n matrices (row i, column j).")
+    parser.add_argument("input", help="Input file with chains (.jsonl)")
+    parser.add_argument("--ids", nargs='+', help="Only the chains with these IDs")
+    parser.add_argument("--metrics", nargs='+', default=['MaxRT', 'AvRT'], help="Metrics per segment (default: MaxRT AvRT; mkRT is not supported)")
+    parser.add_argument("-b", "--bound", type=float, help="Bound for LE-RT")
+    parser.add_argument("-rb", "--relative-bound", type=float, help="Relative bound for LE-RT (relative_bound * MaxRT of the segment)")
+    parser.add_argument("-o", "--output", help="Output file (.jsonl, default: stdout)")
+    args = parser.parse_args()
+
+    if args.bound is not None and args.relative_bound is not None:
+        print("Error: You cannot specify both --bound and --relative-bound at the same time.")
+        return 1
+
+    try:
+        chains = load_chains_from_jsonl(args.input, ids=args.ids)
+    except KeyError as e:
+        print(f"Error: {e.args[0]}")
+        return 1
+
+    out = sys.stdout if args.output is None else open_file(args.output, "w")
+    try:
+        for chain in chains:
+            try:
+                matrices = segment_matrix(chain, args.metrics, bound=args.bound, relative_bound=args.relative_bound)
+            except ValueError as e:
+                print(f"Error: {e}")
+                return 1
+            out.write(json.dumps({"ID": chain.id, **{m: _matrix_as_list(matrix) for m, matrix in matrices.items()}}) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
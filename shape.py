@@ -0,0 +1,157 @@
+"""Indexed queries on the shape of the reaction time of a cause-effect chain.
+
+The anchor points (x_i, y_i) describe the reaction time as a function of the time t of the external activity:
+rt(t) = y_i - (t - x_i) for x_i <= t < x_{i+1}, repeated every hyperperiod (as used by the metrics in analysis.py).
+A Shape stores one hyperperiod of anchor points with a sorted index (bisect) and a sparse table for range maxima, so that
+- rt_at(t): reaction time at time t, in O(log n),
+- max_rt(a, b): maximal reaction time in the window [a, b], in O(log n),
+- exceedances(L, a, b): all intervals in [a, b) with reaction time > L, in O(log n + k log n) for k intervals,
+for any times, including times before the first anchor point or several hyperperiods later (periodic wrap-around).
+"""
+
+import argparse
+import bisect
+import json
+
+from analysis import CEChain, load_shapes_from_jsonl
+
+
+class Shape:
+    """Periodic reaction-time function given by the anchor points of one hyperperiod."""
+
+    def __init__(self, anchorsRT, hyperperiod):
+        assert anchorsRT[0][0] + hyperperiod == anchorsRT[-1][0], "The last anchor point must repeat the first one after one hyperperiod."
+        self.hyperperiod = hyperperiod
+        self.xs = [x for x, _ in anchorsRT[:-1]]
+        self.ys = [y for _, y in anchorsRT[:-1]]
+        self.n = len(self.xs)
+
+        # Sparse table: table[j][i] is the index of the maximal y in ys[i : i + 2**j]
+        self.table = [list(range(self.n))]
+        j = 1
+        while (1 << j) <= self.n:
+            prev = self.table[-1]
+            half = 1 << (j - 1)
+            self.table.append([prev[i] if self.ys[prev[i]] >= self.ys[prev[i + half]] else prev[i + half]
+                               for i in range(self.n - (1 << j) + 1)])
+            j += 1
+        self.argmax = max(range(self.n), key=lambda i: self.ys[i])
+
+    @classmethod
+    def from_chain(cls, chain: CEChain):
+        if chain.anchorsRT is None:
+            chain.calc_anchors()
+        return cls(chain.anchorsRT, chain.hyperperiod)
+
+    def _locate(self, t):
+        # Global index g of the anchor point that determines rt(t), i.e., x(g) <= t < x(g+1)
+        k, offset = divmod(t - self.xs[0], self.hyperperiod)
+        return int(k) * self.n + bisect.bisect_right(self.xs, self.xs[0] + offset) - 1
+
+    def x(self, g):
+        """Time of the anchor point with global index g (index 0 is the first anchor point, negative indices are earlier)."""
+        k, i = divmod(g, self.n)
+        return self.xs[i] + k * self.hyperperiod
+
+    def y(self, g):
+        return self.ys[g % self.n]
+
+    def rt_at(self, t):
+        """Reaction time at time t."""
+        g = self._locate(t)
+        return self.y(g) - (t - self.x(g))
+
+    def _range_argmax(self, lo, hi):
+        # Index of the maximal y in ys[lo..hi] (inclusive, within one hyperperiod)
+        j = (hi - lo + 1).bit_length() - 1
+        left, right = self.table[j][lo], self.table[j][hi - (1 << j) + 1]
+        return left if self.ys[left] >= self.ys[right] else right
+
+    def _global_argmax(self, g1, g2):
+        # Global index of the maximal y among the global indices g1..g2
+        if g2 - g1 + 1 >= self.n:
+            k = -(-(g1 - self.argmax) // self.n)  # first occurrence of argmax at or after g1
+            return self.argmax + k * self.n
+        k1, i1 = divmod(g1, self.n)
+        k2, i2 = divmod(g2, self.n)
+        if k1 == k2:
+            return k1 * self.n + self._range_argmax(i1, i2)
+        left = self._range_argmax(i1, self.n - 1)
+        right = self._range_argmax(0, i2)
+        return k1 * self.n + left if self.ys[left] >= self.ys[right] else k2 * self.n + right
+
+    def max_rt(self, a, b):
+        """Maximal reaction time in the window [a, b]. Attained at a or at an anchor point in (a, b]."""
+        assert a <= b
+        ga, gb = self._locate(a), self._locate(b)
+        value = self.y(ga) - (a - self.x(ga))
+        if gb > ga:
+            value = max(value, self.y(self._global_argmax(ga + 1, gb)))
+        return value
+
+    def _above(self, g1, g2, bound):
+        # Global indices g1 <= g <= g2 with y(g) > bound, in increasing order
+        if g1 > g2 or self.ys[self.argmax] <= bound:
+            return []
+        result = []
+        stack = [(g1, g2)]
+        while stack:
+            lo, hi = stack.pop()
+            if lo > hi:
+                continue
+            g = self._global_argmax(lo, hi)
+            if self.y(g) <= bound:
+                continue
+            result.append(g)
+            stack.append((lo, g - 1))
+            stack.append((g + 1, hi))
+        result.sort()
+        return result
+
+    def exceedances(self, bound, a, b):
+        """All maximal intervals [s, e) within [a, b) where the reaction time exceeds bound."""
+        assert a <= b
+        if a == b:
+            return []
+        ga, gb = self._locate(a), self._locate(b)
+        intervals = []
+        for g in self._above(ga, gb, bound):
+            start = self.x(g)
+            end = start + min(self.y(g) - bound, self.x(g + 1) - start)
+            start, end = max(start, a), min(end, b)
+            if start >= end:
+                continue
+            if intervals and intervals[-1][1] == start:
+                intervals[-1] = (intervals[-1][0], end)  # merge consecutive intervals
+            else:
+                intervals.append((start, end))
+        return intervals
+
+
+##########
+# Main
+##########
+
+def main():
+    parser = argparse.ArgumentParser(description="Point and range queries on stored shapes (see 'analysis.py --save-shapes').")
+    parser.add_argument("input", help="Input file with shapes (.jsonl)")
+    parser.add_argument("--rt-at", type=float, metavar="T", help="Reaction time at time T")
+    parser.add_argument("--max-rt", type=float, nargs=2, metavar=("A", "B"), help="Maximal reaction time in the window [A, B]")
+    parser.add_argument("--exceedances", type=float, nargs=3, metavar=("L", "A", "B"), help="Intervals in [A, B) with reaction time above L")
+
+    args = parser.parse_args()
+
+    for chain in load_shapes_from_jsonl(args.input):
+        shape = Shape.from_chain(chain)
+        res = {"ID": chain.id}
+        if args.rt_at is not None:
+            res["rt_at"] = shape.rt_at(args.rt_at)
+        if args.max_rt is not None:
+            res["max_rt"] = shape.max_rt(*args.max_rt)
+        if args.exceedances is not None:
+            res["exceedances"] = shape.exceedances(*args.exceedances)
+        print(json.dumps(res))
+
+
+if __name__ == "__main__":
+    main()
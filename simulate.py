@@ -0,0 +1,294 @@
+"""Vectorized discrete-event simulation of LET cause-effect chains as ground truth for the analysis.
+
+The simulation does not use the job-chain reasoning of analysis.py (_immfw, anchor points). It generates the read- and
+write-events of every task (NumPy arrays) and traces the data propagation for all releases of the first task at once:
+the data written by a task is read by the next task at its first read-event at or after the write-event
+(searchsorted). Release j of the first task (read-event r_j) samples the external activities in [r_{j-1}, r_j), and its
+data reaches the end of the chain at end_j, so the reaction time of an activity at t in [r_{j-1}, r_j) is end_j - t.
+From these per-release reaction times, the metrics of analyze (MaxRT, MaxRedRT, Reac, MinRT, AvRT, throughp, mkRT,
+LE-RT) are computed empirically over one hyperperiod and compared with the analysis.
+
+Example usage:
+- python3 simulate.py chains/case_studies.jsonl -rb 0.9
+- python3 simulate.py --fuzz --bench UNI --tasks 10 --sets 100000 --maxHTp 1000 -rb 0.9
+"""
+
+import argparse
+import itertools
+import json
+import math
+import multiprocessing
+import random
+import sys
+
+import numpy as np
+
+from analysis import CEChain, MKRange, analyze, ensure_filepath_exists, load_chains_from_jsonl, open_file
+from generate import gen_chain
+
+MaxSimEvents = 10**8  # chains with more simulated events are skipped
+
+
+##########
+# Simulation
+##########
+
+def simulate(chain: CEChain, hyperperiods=2, max_events=MaxSimEvents):
+    """Simulate the releases of the first task over the given number of hyperperiods, starting after all tasks have
+    been released for the first time (from then on, the reaction times repeat every hyperperiod).
+    Returns (reads, ends): reads[0] = r_{-1} and reads[j+1] = r_j are the read-events of the first task, ends[j] is the
+    write-event of the last task of the job chain of release j. Returns None if more than max_events would be generated."""
+    if chain.hyperperiod is None:
+        chain.calc_hyperperiod()
+    phases = [tsk.phase for tsk in chain.tasks]
+    T0 = chain.tasks[0].period
+    number = hyperperiods * chain.hyperperiod // T0
+    first = -(-(max(phases) - phases[0]) // T0)  # first job with read-event after all first releases
+    if number + 1 > max_events:
+        return None
+
+    reads = phases[0] + T0 * np.arange(first, first + number + 1, dtype=np.int64)
+    writes = reads[1:] + chain.tasks[0].deadline
+    events = number + 1
+    for tsk in chain.tasks[1:]:
+        # Read-events of the task from its last read-event before the first write-event to its first after the last
+        lo = max((int(writes[0]) - tsk.phase) // tsk.period, 0)
+        hi = (int(writes[-1]) - tsk.phase) // tsk.period + 2
+        events += hi - lo
+        if events > max_events:
+            return None
+        task_reads = tsk.phase + tsk.period * np.arange(lo, hi, dtype=np.int64)
+        writes = task_reads[np.searchsorted(task_reads, writes, side='left')] + tsk.deadline
+    return reads, writes
+
+
+def empirical_metrics(chain: CEChain, bound=None, relative_bound=None, hyperperiods=2, max_events=MaxSimEvents):
+    """Metrics of analyze from the simulated reaction times (None if the simulation is too large).
+    'periodic' reports whether the reaction times of all simulated hyperperiods are the same."""
+    assert hyperperiods >= 2, "the merging of exceedances over the end of the hyperperiod needs two hyperperiods"
+    assert not (bound and relative_bound), "cannot specify bound and relative bound at the same time"
+    sim = simulate(chain, hyperperiods, max_events)
+    if sim is None:
+        return None
+    reads, ends = sim
+    H = chain.hyperperiod
+    T0 = chain.tasks[0].period
+    n = H // T0  # releases per hyperperiod
+
+    rt_all = ends - reads[:-1]  # maximal reaction time of each release (activity at r_{j-1})
+    age_all = ends - reads[1:]  # infimum of the reaction time of each release (activity just before r_j)
+    rt, age, end = rt_all[:n], age_all[:n], ends[:n]
+    last = end != ends[1:n + 1]  # last release of the first task before a new output
+
+    results = dict()
+    results['periodic'] = bool((rt_all.reshape(hyperperiods, n) == rt[None, :]).all())
+    results['MaxRT'] = int(rt.max())
+    results['MaxRedRT'] = results['MaxRT'] - T0
+    results['Reac'] = int(age[last].max()) + T0
+    results['MinRT'] = int(age.min())
+    results['AvRT'] = int(T0 * (rt + age).sum()) / (2 * H)
+    results['throughp'] = int(last.sum()) / H
+
+    if relative_bound:
+        bound = relative_bound * results['MaxRT']
+    if bound:
+        results['mkRT'] = _mk(age > bound)
+        results['LE-RT'] = _longest_exceedance(reads, ends, bound, n)
+    return results
+
+
+def _mk(fails):
+    # Largest number of fails in k consecutive releases, for all k in MKRange (periodic continuation)
+    K = MKRange[1]
+    n = len(fails)
+    extended = np.resize(fails, n + K)  # repeats the releases of the hyperperiod
+    counts = np.concatenate(([0], np.cumsum(extended)))
+    return [(int((counts[k:k + n] - counts[:n]).max()), k) for k in range(MKRange[0], MKRange[1] + 1)]
+
+
+def _longest_exceedance(reads, ends, bound, n):
+    # Release j exceeds the bound in [r_{j-1}, min(r_j, end_j - bound)); the interval continues with the one of
+    # release j+1 if it reaches r_j and release j+1 exceeds the bound as well
+    exceeds = ends - reads[:-1] > bound
+    finish = np.minimum(reads[1:], ends - bound)
+    continues = np.zeros(len(ends), dtype=bool)
+    continues[:-1] = (finish[:-1] >= reads[1:-1]) & exceeds[1:]
+    if not exceeds[:n].any():
+        return 0
+    breaks = np.flatnonzero(~continues[:n])
+    if len(breaks) == 0:
+        return math.inf
+
+    # One hyperperiod of releases that starts after a break, so no interval continues over its end
+    window = slice(breaks[0] + 1, breaks[0] + 1 + n)
+    exceeds, finish, continues, starts = exceeds[window], finish[window], continues[window], reads[:-1][window]
+    first = exceeds & ~np.concatenate(([False], continues[:-1]))
+    last = exceeds & ~continues
+    return float((finish[last] - starts[first]).max())
+
+
+##########
+# Validation
+##########
+
+def _differs(ours, simulated, key):
+    if key == 'AvRT' or key == 'LE-RT':
+        return not (ours == simulated or math.isclose(ours, simulated, rel_tol=1e-9))
+    if key == 'mkRT':
+        return [list(mk) for mk in ours] != [list(mk) for mk in simulated]
+    return ours != simulated
+
+
+def validate(chain: CEChain, bound=None, relative_bound=None, hyperperiods=2, max_events=MaxSimEvents):
+    """Compare analyze with the simulation. Returns the results of both and a list of the metrics that differ
+    ('periodic' if the simulated reaction times are not periodic); 'skipped' if the simulation is too large."""
+    res = dict()
+    res["ID"] = chain.id
+    res["tasks"] = [{"phase": t.phase, "period": t.period, "deadline": t.deadline} for t in chain.tasks]
+
+    simulated = empirical_metrics(chain, bound=bound, relative_bound=relative_bound,
+                                  hyperperiods=hyperperiods, max_events=max_events)
+    if simulated is None:
+        res['skipped'] = True
+        res['differs'] = []
+        return res
+    ours = analyze(chain, bound=bound, relative_bound=relative_bound)
+
+    res['analysis'] = {key: value for key, value in ours.items() if key in simulated}
+    res['simulation'] = simulated
+    res['differs'] = [key for key in simulated if key != 'periodic' and _differs(ours[key], simulated[key], key)]
+    if not simulated['periodic']:
+        res['differs'].append('periodic')
+    return res
+
+
+def _validate_worker(args):
+    chain, kwargs = args
+    return validate(chain, **kwargs)
+
+
+def run_validation(chains, jobs=None, **kwargs):
+    """Validate all chains in parallel. Yields the results in input order."""
+    if jobs == 1:
+        for chain in chains:
+            yield validate(chain, **kwargs)
+        return
+    with multiprocessing.Pool(jobs) as pool:
+        yield from pool.imap(_validate_worker, ((chain, kwargs) for chain in chains), chunksize=64)
+
+
+def fuzz(bench, number_tasks, jobs=None, batch=1000, max_chains=None, maxHTp=None, maxH=None, **kwargs):
+    """Validate randomly generated chains until the first discrepancy is found.
+    Returns the result of the first discrepancy and the number of checked chains (result is None if no discrepancy is found within max_chains)."""
+    checked = 0
+    for startid in itertools.count(step=batch):
+        number = batch if max_chains is None else min(batch, max_chains - checked)
+        if number <= 0:
+            break
+        chains = [gen_chain(bench, number_tasks, startid + idx, maxHTp=maxHTp, maxH=maxH) for idx in range(number)]
+        for res in run_validation(chains, jobs=jobs, **kwargs):
+            checked += 1
+            if res['differs']:
+                return res, checked
+    return None, checked
+
+
+def save_releases(chain: CEChain, filepath, hyperperiods=2, max_events=MaxSimEvents):
+    """Append the per-release reaction times of one hyperperiod to a JSONL file (read-events of the first task, and
+    the reaction times of the activities at r_{j-1} and just before r_j)."""
+    sim = simulate(chain, hyperperiods, max_events)
+    if sim is None:
+        return
+    reads, ends = sim
+    n = chain.hyperperiod // chain.tasks[0].period
+    with open_file(filepath, "a") as f:
+        f.write(json.dumps({"ID": chain.id, "release": reads[1:n + 1].tolist(), "RT": (ends - reads[:-1])[:n].tolist(),
+                            "RT_end": (ends - reads[1:])[:n].tolist()}) + "\n")
+
+
+##########
+# Main
+##########
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate the analysis with a vectorized simulation of the LET events (MaxRT, MaxRedRT, Reac, MinRT, AvRT, throughp and, with a bound, mkRT and LE-RT).")
+    parser.add_argument("input", nargs='*', help="Input files (.jsonl)")
+    parser.add_argument("-b", "--bound", type=float, help="Bound for mkRT and LE-RT")
+    parser.add_argument("-rb", "--relative-bound", type=float, help="Relative bound for mkRT and LE-RT (relative_bound * MaxRT)")
+    parser.add_argument("-o", "--output", help="Output file to save the mismatching chains (optional)")
+    parser.add_argument("-j", "--jobs", type=int, help="Number of parallel processes (default: number of CPUs)")
+    parser.add_argument("--hyperperiods", type=int, default=2, help="Number of simulated hyperperiods (default: 2)")
+    parser.add_argument("--max-events", type=int, default=MaxSimEvents, help=f"Skip chains with more simulated events (default: {MaxSimEvents})")
+    parser.add_argument("--releases", help="Output file for the per-release reaction times of the input chains (optional)")
+    parser.add_argument("--fuzz", action="store_true", help="Validate randomly generated chains until the first discrepancy is found.")
+    parser.add_argument("--bench", choices=["WATERS", "UNI"], default="WATERS", help="Fuzzing: benchmark type (default: WATERS)")
+    parser.add_argument("--tasks", type=int, default=5, help="Fuzzing: number of tasks per chain (default: 5)")
+    parser.add_argument("--sets", type=int, default=None, help="Fuzzing: maximal number of chains to check (default: unlimited)")
+    parser.add_argument("--maxH", type=int, default=None, help="Fuzzing: maximal allowed value of Hyperperiod. (For generator UNIFORM only.)")
+    parser.add_argument("--maxHTp", type=int, default=None, help="Fuzzing: maximal allowed value of Hyperperiod / maximal period. (For generator UNIFORM only.)")
+    parser.add_argument("--seed", type=int, help="Fuzzing: random seed")
+
+    args = parser.parse_args()
+
+    if args.bound is not None and args.relative_bound is not None:
+        print("Error: You cannot specify both --bound and --relative-bound at the same time.")
+        return 1
+    if args.hyperperiods < 2:
+        parser.error("--hyperperiods must be at least 2")
+    kwargs = dict(bound=args.bound, relative_bound=args.relative_bound, hyperperiods=args.hyperperiods, max_events=args.max_events)
+
+    if args.fuzz:
+        if args.seed is not None:
+            random.seed(args.seed)
+            np.random.seed(args.seed)
+        res, checked = fuzz(args.bench, args.tasks, jobs=args.jobs, max_chains=args.sets, maxHTp=args.maxHTp, maxH=args.maxH, **kwargs)
+        if res is None:
+            print(f"- No discrepancy in {checked} chains")
+            return 0
+        print(f"- Discrepancy found after {checked} chains:")
+        print(json.dumps(res))
+        if args.output:
+            ensure_filepath_exists(args.output)
+            with open(args.output, "w") as f:
+                f.write(json.dumps(res) + "\n")
+        return 1
+
+    if not args.input:
+        parser.error("no input file specified (use --fuzz to check random chains)")
+
+    chains = []
+    for filename in args.input:
+        chains.extend(load_chains_from_jsonl(filename))
+
+    if args.releases:
+        ensure_filepath_exists(args.releases)
+        open_file(args.releases, "w").close()
+        for chain in chains:
+            save_releases(chain, args.releases, args.hyperperiods, args.max_events)
+
+    mismatches = []
+    skipped = 0
+    counts = dict()
+    for res in run_validation(chains, jobs=args.jobs, **kwargs):
+        skipped += res.get('skipped', False)
+        for key in res['differs']:
+            counts[key] = counts.get(key, 0) + 1
+        if res['differs']:
+            mismatches.append(res)
+            print(json.dumps(res))
+
+    print(f"- {len(mismatches)} of {len(chains) - skipped} chains differ ({skipped} skipped)")
+    for key, count in counts.items():
+        print(f"- {key} differs in {count} cases")
+
+    if args.output:
+        ensure_filepath_exists(args.output)
+        with open(args.output, "w") as f:
+            for r in mismatches:
+                f.write(json.dumps(r) + "\n")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
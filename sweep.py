@@ -0,0 +1,187 @@
+"""Parametric sweep: metrics as exact piecewise-linear functions of the phase or the deadline of one task.
+
+The partitioned job chains (and hence the anchor points) only change when a read-event of a task coincides with a
+write-event of its predecessor, or a write-event coincides with a read-event of its successor. For the phase of task
+k this happens at phase = phase_{k-1} + D_{k-1} (mod gcd(T_{k-1}, T_k)) and at phase = phase_{k+1} - D_k
+(mod gcd(T_k, T_{k+1})); for the deadline only the second condition applies. Between two consecutive breakpoints all
+job chains are the same, and the metrics are linear:
+- constant if the task is neither the first nor the last task,
+- with slope -1 for the phase of the first task (all job chains start later),
+- with slope +1 for the phase or the deadline of the last task (all job chains end later).
+Hence it suffices to analyze the chain at each breakpoint and directly after each breakpoint.
+"""
+
+import argparse
+import json
+import math
+import sys
+
+from analysis import CEChain, Task, load_chains_from_jsonl, ensure_filepath_exists
+from analysis import maximumRT, minimumRT, reactive, averageRT
+
+METRICS = {
+    'MaxRT': maximumRT,
+    'MinRT': minimumRT,
+    'Reac': reactive,
+    'AvRT': averageRT,
+}
+
+
+def _with_parameter(chain: CEChain, taskidx, param, value):
+    """Copy of the chain where the phase or deadline of task taskidx is replaced by value."""
+    tasks = []
+    for idx, tsk in enumerate(chain.tasks):
+        if idx == taskidx:
+            tsk = Task(value, tsk.period, tsk.deadline) if param == 'phase' else Task(tsk.phase, tsk.period, value)
+        else:
+            tsk = Task(tsk.phase, tsk.period, tsk.deadline)
+        tasks.append(tsk)
+    new_chain = CEChain(*tasks, id=chain.id)
+    new_chain.hyperperiod = chain.hyperperiod  # does not depend on phases and deadlines
+    return new_chain
+
+
+def _evaluate(chain: CEChain, taskidx, param, value, metrics):
+    new_chain = _with_parameter(chain, taskidx, param, value)
+    new_chain.calc_anchors()
+    return {m: METRICS[m](new_chain) for m in metrics}
+
+
+def breakpoints(chain: CEChain, taskidx, param, lo, hi):
+    """Parameter values in [lo, hi] at which the partitioned job chains can change."""
+    tasks = chain.tasks
+    tsk = tasks[taskidx]
+    residues = []  # (residue, modulus)
+    if param == 'phase' and taskidx > 0:
+        # read-event of task coincides with write-event of predecessor
+        prev = tasks[taskidx - 1]
+        residues.append((prev.phase + prev.deadline, math.gcd(prev.period, tsk.period)))
+    if taskidx < len(tasks) - 1:
+        # write-event of task coincides with read-event of successor
+        nxt = tasks[taskidx + 1]
+        g = math.gcd(tsk.period, nxt.period)
+        if param == 'phase':
+            residues.append((nxt.phase - tsk.deadline, g))
+        else:
+            residues.append((nxt.phase - tsk.phase, g))
+
+    points = set()
+    for residue, modulus in residues:
+        first = lo + (residue - lo) % modulus
+        points.update(range(first, hi + 1, modulus))
+    return sorted(points)
+
+
+def slope(chain: CEChain, taskidx, param):
+    """Slope of all metrics between two breakpoints."""
+    s = 0
+    if taskidx == len(chain.tasks) - 1:
+        s += 1  # all job chains end later
+    if param == 'phase' and taskidx == 0:
+        s -= 1  # all job chains start later
+    return s
+
+
+def sweep(chain: CEChain, taskidx, param='phase', lo=None, hi=None, metrics=tuple(METRICS.keys())):
+    """Exact piecewise-linear function of the metrics over the parameter range [lo, hi] (integers).
+    Default range: [0, T-1] for the phase and [1, T] for the deadline.
+    Returns a list of pieces {'from': a, 'to': b, 'values': {metric: value at a}, 'slope': s},
+    i.e., metric(x) = values[metric] + slope * (x - a) for all integers a <= x <= b."""
+    assert param in ('phase', 'deadline'), f"{param} is not a possible parameter."
+    tsk = chain.tasks[taskidx]
+    if lo is None:
+        lo = 0 if param == 'phase' else 1
+    if hi is None:
+        hi = tsk.period - 1 if param == 'phase' else tsk.period
+    assert lo <= hi
+    if chain.hyperperiod is None:
+        chain.calc_hyperperiod()
+
+    s = slope(chain, taskidx, param)
+    points = breakpoints(chain, taskidx, param, lo, hi)
+
+    # Pieces: each breakpoint and the open interval after it (and the interval before the first breakpoint)
+    starts = []
+    if not points or points[0] > lo:
+        starts.append(lo)
+    for b in points:
+        starts.append(b)
+        if b + 1 <= hi and (b + 1) not in points:
+            starts.append(b + 1)
+    starts = sorted(set(starts))
+
+    pieces = []
+    for idx, a in enumerate(starts):
+        b = starts[idx + 1] - 1 if idx + 1 < len(starts) else hi
+        values = _evaluate(chain, taskidx, param, a, metrics)
+        # Merge with previous piece if it continues linearly
+        if pieces and pieces[-1]['slope'] == s and all(
+                pieces[-1]['values'][m] + s * (a - pieces[-1]['from']) == values[m] for m in metrics):
+            pieces[-1]['to'] = b
+        else:
+            pieces.append({'from': a, 'to': b, 'values': values, 'slope': s})
+    return pieces
+
+
+def evaluate_pieces(pieces, x):
+    """Evaluate the piecewise function from sweep() at parameter x."""
+    for piece in pieces:
+        if piece['from'] <= x <= piece['to']:
+            return {m: v + piece['slope'] * (x - piece['from']) for m, v in piece['values'].items()}
+    raise ValueError(f'{x} is outside of the swept range.')
+
+
+def check_sweep(chain: CEChain, taskidx, param, pieces):
+    """Compare the piecewise function with the analysis at every integer of the range. Returns a list of deviating parameter values."""
+    deviations = []
+    metrics = list(pieces[0]['values'].keys())
+    for x in range(pieces[0]['from'], pieces[-1]['to'] + 1):
+        expected = _evaluate(chain, taskidx, param, x, metrics)
+        got = evaluate_pieces(pieces, x)
+        if any(abs(expected[m] - got[m]) > 1e-9 for m in metrics):
+            deviations.append(x)
+    return deviations
+
+
+##########
+# Main
+##########
+
+def main():
+    parser = argparse.ArgumentParser(description="Metrics of CEChains as exact piecewise-linear functions of the phase or deadline of one task.")
+    parser.add_argument("input", help="Input file (.jsonl)")
+    parser.add_argument("--task", type=int, required=True, help="Index of the task whose parameter is swept (starting at 0)")
+    parser.add_argument("--param", choices=['phase', 'deadline'], default='phase', help="Parameter to be swept (default: phase)")
+    parser.add_argument("--range", type=int, nargs=2, metavar=('LO', 'HI'), help="Parameter range (default: [0, T-1] for the phase, [1, T] for the deadline)")
+    parser.add_argument("--check", action="store_true", help="Verify the result by analyzing every integer parameter value")
+    parser.add_argument("-o", "--output", help="Output file to save results (optional)")
+    parser.add_argument("--no-print", action="store_true", help="Do not print results to stdout")
+
+    args = parser.parse_args()
+
+    chains = load_chains_from_jsonl(args.input)
+    lo, hi = args.range if args.range else (None, None)
+
+    results = []
+    failed = False
+    for chain in chains:
+        pieces = sweep(chain, args.task, args.param, lo, hi)
+        res = {"ID": chain.id, "task": args.task, "param": args.param, "pieces": pieces}
+        if args.check:
+            res['deviations'] = check_sweep(chain, args.task, args.param, pieces)
+            failed = failed or len(res['deviations']) > 0
+        results.append(res)
+        if not args.no_print:
+            print(json.dumps(res))
+
+    if args.output:
+        ensure_filepath_exists(args.output)
+        with open(args.output, "w") as f:
+            for r in results:
+                f.write(json.dumps(r) + "\n")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""Live progress telemetry for batch runs.
+
+A Progress object is informed about the start and end of each chain analysis. A background thread periodically
+- prints a progress line (chains done, chains/s, ETA, current chain, slowest chain, timeouts, peak RSS),
+- writes the same information as JSON status file,
+- writes it in the Prometheus text exposition format (e.g., for the textfile collector of the node exporter).
+All files are replaced atomically, so they can be read at any time.
+"""
+
+import json
+import math
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process and its (terminated) child processes, None if not available."""
+    if resource is None:
+        return None
+    scale = 1 if sys.platform == "darwin" else 1024  # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss) * scale
+
+
+def _htp(chain):
+    periods = [tsk.period for tsk in chain.tasks]
+    return math.lcm(*periods) / max(periods)
+
+
+def _write_atomic(filepath, text):
+    directory = os.path.dirname(filepath)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(filepath + ".tmp", "w") as f:
+        f.write(text)
+    os.replace(filepath + ".tmp", filepath)
+
+
+def _label(value):
+    # Escape a Prometheus label value
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class Progress:
+    """Progress of a batch run with periodic reports (every interval seconds) to a stream, a status file and/or a Prometheus file."""
+
+    def __init__(self, total=None, interval=10.0, stream=None, status_file=None, prom_file=None, prefix="e2e_analysis"):
+        self.total = total
+        self.interval = interval
+        self.stream = stream
+        self.status_file = status_file
+        self.prom_file = prom_file
+        self.prefix = prefix
+
+        self.lock = threading.Lock()
+        self.start_time = time.time()
+        self.done = 0
+        self.timeouts = 0
+        self.current = None  # (ID, H/Tp, start time)
+        self.slowest = None  # (ID, H/Tp, runtime)
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    def begin(self, chain):
+        """The analysis of the chain starts."""
+        with self.lock:
+            self.current = (chain.id, _htp(chain), time.time())
+
+    def end(self, chain, timeout=False):
+        """The analysis of the chain finished (timeout: it exceeded the timeout)."""
+        with self.lock:
+            start = self.current[2] if self.current is not None and self.current[0] == chain.id else time.time()
+            runtime = time.time() - start
+            self.done += 1
+            self.timeouts += bool(timeout)
+            if self.slowest is None or runtime > self.slowest[2]:
+                self.slowest = (chain.id, _htp(chain), runtime)
+            self.current = None
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            now = time.time()
+            elapsed = now - self.start_time
+            rate = self.done / elapsed if elapsed > 0 else 0.0
+            eta = None
+            if self.total is not None and rate > 0:
+                eta = (self.total - self.done) / rate
+            snap = {
+                "done": self.done,
+                "total": self.total,
+                "elapsed_sec": elapsed,
+                "chains_per_sec": rate,
+                "eta_sec": eta,
+                "timeouts": self.timeouts,
+                "peak_rss_bytes": peak_rss_bytes(),
+                "current": None,
+                "slowest": None,
+                "updated": now,
+            }
+            if self.current is not None:
+                snap["current"] = {"ID": self.current[0], "H/Tp": self.current[1], "running_sec": now - self.current[2]}
+            if self.slowest is not None:
+                snap["slowest"] = {"ID": self.slowest[0], "H/Tp": self.slowest[1], "runtime_sec": self.slowest[2]}
+        return snap
+
+    @staticmethod
+    def format_line(snap) -> str:
+        total = "?" if snap["total"] is None else snap["total"]
+        eta = "?" if snap["eta_sec"] is None else f"{snap['eta_sec']:.0f}s"
+        line = f"[progress] {snap['done']}/{total} chains, {snap['chains_per_sec']:.2f} chains/s, ETA {eta}, timeouts {snap['timeouts']}"
+        if snap["current"] is not None:
+            cur = snap["current"]
+            line += f", current {cur['ID']} (H/Tp={cur['H/Tp']:g}, {cur['running_sec']:.1f}s)"
+        if snap["slowest"] is not None:
+            slow = snap["slowest"]
+            line += f", slowest {slow['ID']} (H/Tp={slow['H/Tp']:g}, {slow['runtime_sec']:.2f}s)"
+        if snap["peak_rss_bytes"] is not None:
+            line += f", peak RSS {snap['peak_rss_bytes'] / 2**20:.1f} MiB"
+        return line
+
+    def prometheus_text(self, snap) -> str:
+        """Snapshot in the Prometheus text exposition format."""
+        p = self.prefix
+        lines = []
+
+        def metric(name, kind, help, value, labels=None):
+            if value is None:
+                return
+            lines.append(f"# HELP {p}_{name} {help}")
+            lines.append(f"# TYPE {p}_{name} {kind}")
+            label_text = "" if not labels else "{" + ",".join(f'{k}="{_label(v)}"' for k, v in labels.items()) + "}"
+            lines.append(f"{p}_{name}{label_text} {value}")
+
+        metric("chains_done_total", "counter", "Number of analyzed chains.", snap["done"])
+        metric("chains", "gauge", "Total number of chains of the run.", snap["total"])
+        metric("chains_per_second", "gauge", "Average number of analyzed chains per second.", snap["chains_per_sec"])
+        metric("eta_seconds", "gauge", "Estimated remaining time in seconds.", snap["eta_sec"])
+        metric("timeouts_total", "counter", "Number of chains that exceeded the timeout.", snap["timeouts"])
+        metric("elapsed_seconds", "gauge", "Elapsed time of the run in seconds.", snap["elapsed_sec"])
+        metric("peak_rss_bytes", "gauge", "Peak resident set size in bytes.", snap["peak_rss_bytes"])
+        if snap["current"] is not None:
+            cur = snap["current"]
+            metric("current_chain_running_seconds", "gauge", "Runtime of the chain that is currently analyzed.",
+                   cur["running_sec"], {"id": cur["ID"], "htp": f"{cur['H/Tp']:g}"})
+        if snap["slowest"] is not None:
+            slow = snap["slowest"]
+            metric("slowest_chain_seconds", "gauge", "Runtime of the slowest chain so far.",
+                   slow["runtime_sec"], {"id": slow["ID"], "htp": f"{slow['H/Tp']:g}"})
+        return "\n".join(lines) + "\n"
+
+    def report(self):
+        snap = self.snapshot()
+        if self.stream is not None:
+            print(self.format_line(snap), file=self.stream, flush=True)
+        if self.status_file is not None:
+            _write_atomic(self.status_file, json.dumps(snap, indent=4))
+        if self.prom_file is not None:
+            _write_atomic(self.prom_file, self.prometheus_text(snap))
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.report()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the periodic reports and report the final state."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.report()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()